@@ -0,0 +1,134 @@
+"""
+Extraction benchmark - Throughput of price extraction on saved product pages
+
+Usage:
+    python bench_extraction.py [PAGE ...]
+
+Compares the previous per-pattern extractor (every pattern compiled and run
+over the whole page, findall included) with PriceScanner on the whole page and
+with PriceScanner fed 32 KB chunks the way pages are streamed, stopping early.
+Checks that the whole-page results agree and prints MB/s of page size for
+each. Pages may be gzipped (.gz). Without arguments the product pages in
+bench_pages/ are used; `--synthetic` adds a generated 2 MB page.
+"""
+
+import gzip
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from price_extraction import PriceScanner, extract_price_info
+
+PAGES_DIR = Path(__file__).resolve().parent / "bench_pages"
+
+
+def legacy_extract_price_info(html_content: str) -> Dict[str, Any]:
+    """The per-pattern extractor PriceScanner replaced, kept as the baseline"""
+    price_patterns = [
+        r'₹\s*([0-9,]+\.?[0-9]*)',
+        r'\$\s*([0-9,]+\.?[0-9]*)',
+        r'price["\']:\s*["\']?([0-9,]+\.?[0-9]*)',
+        r'amount["\']:\s*["\']?([0-9,]+\.?[0-9]*)'
+    ]
+
+    base_price = 0.0
+    for pattern in price_patterns:
+        matches = re.findall(pattern, html_content, re.IGNORECASE)
+        if matches:
+            try:
+                base_price = float(matches[0].replace(',', ''))
+                break
+            except ValueError:
+                continue
+
+    availability = True
+    for pattern in [r'out of stock', r'currently unavailable', r'sold out', r'not available']:
+        if re.search(pattern, html_content, re.IGNORECASE):
+            availability = False
+            break
+
+    delivery_time = "3-5 days"
+    for pattern in [r'delivery in (\d+-?\d* days?)', r'ships in (\d+-?\d* days?)', r'arrives (\w+ \d+)']:
+        matches = re.findall(pattern, html_content, re.IGNORECASE)
+        if matches:
+            delivery_time = matches[0]
+            break
+
+    return {
+        "base_price": base_price,
+        "availability": availability,
+        "delivery_time": delivery_time,
+        "deals": [],
+        "confidence": 0.8 if base_price > 0 else 0.3
+    }
+
+
+def synthetic_page(size: int = 2 * 1024 * 1024) -> str:
+    """Product-page-shaped HTML: scripts and markup around a buy box"""
+    filler = "".join(
+        f'<div class="item-{i}" data-id="{i * 7919 % 100003}"><a href="/p/{i}">Related product {i}</a></div>\n'
+        for i in range(200)
+    )
+    head = '<html><head><script>var config = {"locale": "en-IN", "cart": []};</script></head><body>'
+    buy_box = (
+        '<div id="buybox"><span class="price">₹1,299.00</span>'
+        '<span>In stock</span><span>Delivery in 2-3 days</span></div>'
+    )
+    body = filler * (size // len(filler) // 2)
+    return head + body + buy_box + body + "</body></html>"
+
+
+def streamed_extract_price_info(html_content: str, chunk_size: int = 32 * 1024) -> Dict[str, Any]:
+    """PriceScanner fed the way read_page feeds it, stopping once it is done"""
+    scanner = PriceScanner()
+    for start in range(0, len(html_content), chunk_size):
+        if scanner.feed(html_content[start:start + chunk_size]):
+            break
+    scanner.feed("", final=True)
+    return scanner.result()
+
+
+def measure(extract: Callable[[str], Dict[str, Any]], html: str, min_seconds: float = 1.0) -> float:
+    """Throughput in MB/s"""
+    runs = 0
+    started = time.perf_counter()
+    while True:
+        extract(html)
+        runs += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return runs * len(html.encode('utf-8')) / elapsed / 1e6
+
+
+def read_page(path: Path) -> str:
+    data = path.read_bytes()
+    if path.suffix == ".gz":
+        data = gzip.decompress(data)
+    return data.decode('utf-8', errors='replace')
+
+
+def main(args: List[str]) -> None:
+    paths = [Path(arg) for arg in args if arg != "--synthetic"] or sorted(PAGES_DIR.glob("*.html*"))
+    pages: List[Tuple[str, str]] = [(path.name.split(".")[0], read_page(path)) for path in paths]
+    if "--synthetic" in args:
+        pages.append(("synthetic", synthetic_page()))
+
+    print(f"{'page':<32} {'size':>9} {'before MB/s':>12} {'after MB/s':>11} {'streamed MB/s':>14}")
+    for name, html in pages:
+        before, after = legacy_extract_price_info(html), extract_price_info(html)
+        if before != after:
+            print(f"{name}: results differ\n  before: {before}\n  after:  {after}")
+
+        before_rate = measure(legacy_extract_price_info, html)
+        after_rate = measure(extract_price_info, html)
+        streamed_rate = measure(streamed_extract_price_info, html)
+        print(
+            f"{name[-32:]:<32} {len(html):>9} {before_rate:>12.1f} {after_rate:>11.1f} "
+            f"{streamed_rate:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
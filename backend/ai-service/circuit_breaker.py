@@ -0,0 +1,172 @@
+"""
+Circuit Breakers - Skip retailers and product pages that are failing
+
+A platform's breaker opens after a run of consecutive failures (timeouts,
+connection errors, 5xx, or 429 when a retailer throttles us) and rejects fetches
+immediately instead of letting each one wait for its timeout. After
+`reset_timeout` it turns half-open and lets a trickle of probe fetches
+through; a successful probe closes it, a failed one opens it again.
+
+`FailureCache` remembers failed URLs for a short time so repeated requests
+for a broken page fail fast too.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from http_client import HTTPStatusError, is_transport_error
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """Raised instead of fetching from a platform whose breaker is open"""
+
+
+class RecentlyFailedError(Exception):
+    """Raised instead of refetching a URL that failed moments ago"""
+
+
+def is_platform_failure(error: BaseException) -> bool:
+    """
+    Whether a fetch error counts against the platform's breaker
+
+    Only an unreachable or unhealthy retailer counts; errors about the page
+    itself (4xx, bad encodings, oversized bodies, parse errors, disallowed
+    redirects) go to the failure cache alone.
+    """
+    if isinstance(error, HTTPStatusError):
+        return error.status >= 500 or error.status == 429
+    return is_transport_error(error)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker for one platform
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_probes: int = 1
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0  # Probe fetches in flight while half-open
+        self._stats: Dict[str, int] = {"opened": 0, "rejected": 0}
+
+    def allow(self) -> bool:
+        """Whether a fetch may start now; every allowed fetch must be followed by one record call"""
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                self._stats["rejected"] += 1
+                return False
+            self.state = HALF_OPEN
+            logger.info(f"🔌 Circuit for {self.name} half-open; probing")
+        if self.state == HALF_OPEN:
+            if self._probes >= self.half_open_probes:
+                self._stats["rejected"] += 1
+                return False
+            self._probes += 1
+        return True
+
+    def record_success(self) -> None:
+        if self.state == HALF_OPEN:
+            logger.info(f"✅ Circuit for {self.name} closed")
+        self.state = CLOSED
+        self._failures = 0
+        self._probes = 0
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self._stats["opened"] += 1
+                logger.warning(f"🚫 Circuit for {self.name} opened after {self._failures} failures")
+            self.state = OPEN
+            self._opened_at = time.monotonic()
+            self._probes = 0
+
+    def record_cancelled(self) -> None:
+        """An allowed fetch ended without a verdict; free its probe slot"""
+        if self.state == HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"state": self.state, "consecutive_failures": self._failures, **self._stats}
+
+
+class CircuitBreakers:
+    """Lazily created breaker per platform"""
+
+    def __init__(self, **options: Any):
+        self.options = options
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, platform: str) -> CircuitBreaker:
+        breaker = self._breakers.get(platform)
+        if breaker is None:
+            breaker = self._breakers[platform] = CircuitBreaker(platform, **self.options)
+        return breaker
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {platform: breaker.get_stats() for platform, breaker in self._breakers.items()}
+
+
+class FailureCache:
+    """
+    Negative cache: recently failed keys with the error they failed with
+    """
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 10_000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._stats: Dict[str, int] = {"hits": 0, "stored": 0}
+
+    def get(self, key: str) -> Optional[str]:
+        """The error message if `key` failed within the TTL"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, message = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._stats["hits"] += 1
+        return message
+
+    def set(self, key: str, message: str) -> None:
+        self._entries.pop(key, None)
+        self._entries[key] = (time.monotonic() + self.ttl, message)
+        self._stats["stored"] += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "ttl": self.ttl, **self._stats}
+
+
+__all__ = [
+    "CircuitBreaker",
+    "CircuitBreakers",
+    "CircuitOpenError",
+    "FailureCache",
+    "RecentlyFailedError",
+    "is_platform_failure",
+]
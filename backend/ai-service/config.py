@@ -45,8 +45,102 @@ class Settings(BaseSettings):
     )
     google_api_key: str = Field(..., description="API key for Google AI services")
 
+    # Retailer HTTP client settings
+    http_pool_limit: int = Field(
+        100, description="Maximum open connections for retailer fetches"
+    )
+    http_pool_limit_per_host: int = Field(
+        10, description="Maximum open connections per retailer host"
+    )
+    http_dns_cache_ttl: int = Field(300, description="DNS cache TTL in seconds")
+    http_keepalive_timeout: float = Field(
+        30.0, description="Seconds an idle pooled connection is kept open"
+    )
+    http_timeout: float = Field(10.0, description="Per-request timeout in seconds")
+    scrape_max_in_flight: int = Field(
+        50, description="Global cap on simultaneous retailer fetches"
+    )
+    scrape_max_page_bytes: int = Field(
+        4 * 1024 * 1024, description="Maximum decompressed bytes read from one product page"
+    )
+    scrape_max_compression_ratio: float = Field(
+        200.0, description="Reject pages that inflate beyond this ratio (decompression bombs)"
+    )
+    compare_deadline: float = Field(
+        8.0, description="Seconds a price comparison waits for retailers before returning partial results"
+    )
+    hedge_enabled: bool = Field(
+        True, description="Send a duplicate retailer fetch when one is slower than the platform's p95"
+    )
+    hedge_percentile: float = Field(0.95, description="Latency percentile after which a fetch is hedged")
+    hedge_max_ratio: float = Field(
+        0.05, description="Maximum hedged fetches as a fraction of all retailer fetches"
+    )
+    retry_max_attempts: int = Field(3, description="Attempts per retailer fetch, including the first")
+    retry_base_delay: float = Field(0.2, description="Backoff window in seconds before the first retry")
+    retry_max_delay: float = Field(2.0, description="Largest backoff window in seconds")
+    retry_budget_ratio: float = Field(
+        0.1, description="Maximum retries as a fraction of retailer fetches, process-wide"
+    )
+    breaker_failure_threshold: int = Field(
+        5, description="Consecutive failed fetches that open a platform's circuit breaker"
+    )
+    breaker_reset_timeout: float = Field(
+        30.0, description="Seconds an open circuit breaker waits before probing the platform"
+    )
+    breaker_half_open_probes: int = Field(
+        1, description="Probe fetches allowed at a time while a circuit breaker is half-open"
+    )
+    negative_cache_ttl: float = Field(30.0, description="Seconds a failed product URL is not refetched")
+    parse_workers: int = Field(
+        4, description="Worker threads for page decoding and parsing (0 parses on the event loop)"
+    )
+    parse_max_queue: int = Field(
+        64, description="Maximum parse jobs queued or running across the parse workers"
+    )
+    parse_processes: bool = Field(
+        False, description="Run parse workers as processes, so pages are parsed on several cores"
+    )
+    loop_lag_interval: float = Field(
+        0.1, description="Seconds between event-loop lag samples"
+    )
+
     # Caching settings
     redis_url: str = Field("redis://localhost:6379", description="URL for Redis cache")
+    price_cache_max_entries: int = Field(
+        10_000, description="Maximum cached price comparisons per worker"
+    )
+    price_cache_max_bytes: int = Field(
+        64 * 1024 * 1024, description="Memory budget for cached price comparisons per worker"
+    )
+    platform_cache_max_entries: int = Field(
+        50_000, description="Maximum cached per-platform prices per worker"
+    )
+    platform_cache_max_bytes: int = Field(
+        128 * 1024 * 1024, description="Memory budget for cached per-platform prices per worker"
+    )
+    price_stale_while_revalidate: bool = Field(
+        True, description="Serve expired prices while refreshing them in the background"
+    )
+    price_max_staleness: int = Field(
+        3600, description="Seconds past expiry after which a synchronous refetch is forced"
+    )
+    price_ttl_min: int = Field(60, description="Shortest adaptive price TTL in seconds")
+    price_ttl_max: int = Field(86400, description="Longest adaptive price TTL in seconds")
+    price_ttl_change_probability: float = Field(
+        0.1, description="Target chance that a price changes before its cache entry expires"
+    )
+    refresh_budget_per_minute: int = Field(
+        60, description="Maximum background price refreshes per minute per worker"
+    )
+    refresh_interval: float = Field(5.0, description="Seconds between refresh scheduling cycles")
+    refresh_lookahead: float = Field(
+        30.0, description="Refresh hot prices this many seconds before they expire"
+    )
+    refresh_concurrency: int = Field(4, description="Simultaneous background refreshes")
+    redis_enabled: bool = Field(
+        False, description="Use redis_url for cross-worker fetch coalescing and caching"
+    )
 
     # Feature flags
     enable_stacksmart: bool = Field(
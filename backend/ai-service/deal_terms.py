@@ -0,0 +1,175 @@
+"""
+Deal Terms Parser - Structured constraints from free-text deal terms
+
+Turns common phrasings such as "not valid with other coupons", "min order ₹499",
+"only on HDFC cards", "not valid on Amex cards" or "max discount ₹150" into
+structured constraints that StackSmart feeds into its compatibility and
+eligibility masks. Each distinct term is parsed once per process; results are
+cached by a hash of the term text.
+"""
+
+import hashlib
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Dict, Any, FrozenSet, Optional
+
+from eligibility import attribute_bits, MEMBERSHIP_MASK, NETWORK_MASK, ISSUER_MASK
+
+
+@dataclass(frozen=True)
+class TermConstraints:
+    not_combinable_with: FrozenSet[str] = frozenset()  # DealType values
+    standalone: bool = False  # Not combinable with any other offer
+    min_order: Optional[float] = None
+    max_discount: Optional[float] = None
+    eligibility_bits: int = 0  # Card networks, issuers and memberships the deal is for
+    excluded_bits: int = 0  # Card networks, issuers and memberships the deal is not valid for
+    requires_card: bool = False
+    requires_membership: bool = False
+
+
+_AMOUNT = r"(?:₹|rs\.?|inr|\$|usd)\s*([0-9][0-9,]*(?:\.[0-9]+)?)"
+
+_NOT_COMBINABLE_PATTERN = re.compile(
+    r"(?:not|cannot|can't|can ?not)\s+(?:be\s+)?(?:valid|applicable|combined|clubbed|used|stacked)"
+    r"\s+(?:with|along ?with|together with)\s+(?:any\s+)?(?:other\s+)?"
+    r"(coupons?|promo ?codes?|codes?|cashback|bank offers?|card offers?|wallet offers?"
+    r"|offers?|deals?|discounts?|promotions?)"
+)
+_EXCLUSIVE_PATTERN = re.compile(r"\b(?:one|single)\s+(?:coupon|offer|code)\s+per\s+(?:order|transaction)\b")
+
+_MIN_ORDER_PATTERN = re.compile(
+    r"(?:min(?:imum)?\.?\s*(?:order|purchase|cart|transaction|spend)(?:\s*value)?(?:\s*of)?\s*[:\-]?\s*"
+    r"|(?:on|for)\s+(?:orders?|purchases?|carts?)\s+(?:above|over|of|worth)\s*(?:at least\s*)?)"
+    + _AMOUNT
+)
+_MAX_DISCOUNT_PATTERN = re.compile(
+    r"(?:max(?:imum)?\.?\s*(?:discount|cashback|savings?|off|benefit)(?:\s*of)?\s*[:\-]?\s*"
+    r"|(?:up ?to|capped at|cap of)\s*)"
+    + _AMOUNT
+)
+_CARD_PATTERN = re.compile(r"\bcards?\b")
+# "Not valid on HDFC cards", "excludes ICICI cards", "except Amex": attributes
+# named after the phrase, up to the end of the clause, are exclusions
+_EXCLUSION_PATTERN = re.compile(
+    r"\b(?:not\s+(?:valid|applicable|available|eligible)\s+(?:on|for|with|to)"
+    r"|excludes?|excluding|except(?:\s+for)?)\b"
+)
+_CLAUSE_END_PATTERN = re.compile(r"[.;]|\bbut\b|\bonly\b")
+_MEMBER_PATTERN = re.compile(r"\b(?:members?|membership|only|exclusive)\b")
+
+_COMBINATION_TYPES: Dict[str, FrozenSet[str]] = {
+    "coupon": frozenset({"coupon"}),
+    "promo code": frozenset({"coupon"}),
+    "promocode": frozenset({"coupon"}),
+    "code": frozenset({"coupon"}),
+    "cashback": frozenset({"cashback"}),
+    "bank offer": frozenset({"card_offer"}),
+    "card offer": frozenset({"card_offer"}),
+    "wallet offer": frozenset({"wallet_offer"}),
+}
+
+_TERM_CACHE: "OrderedDict[bytes, TermConstraints]" = OrderedDict()
+_TERM_CACHE_SIZE = 10_000
+_cache_stats: Dict[str, int] = {"hits": 0, "misses": 0}
+
+
+def _amount(value: str) -> float:
+    return float(value.replace(',', ''))
+
+
+def _parse_uncached(term: str) -> TermConstraints:
+    """Parse a single term into constraints"""
+    text = term.lower()
+
+    not_combinable: FrozenSet[str] = frozenset()
+    standalone = bool(_EXCLUSIVE_PATTERN.search(text))
+    for match in _NOT_COMBINABLE_PATTERN.finditer(text):
+        noun = match.group(1).rstrip('s') if match.group(1) != "cashback" else "cashback"
+        types = _COMBINATION_TYPES.get(noun)
+        if types is None:
+            standalone = True  # Generic "offers", "deals", "discounts", "promotions"
+        else:
+            not_combinable = not_combinable | types
+
+    min_match = _MIN_ORDER_PATTERN.search(text)
+    max_match = _MAX_DISCOUNT_PATTERN.search(text)
+
+    # Blank out exclusion clauses, so the rest only names attributes the deal requires
+    excluded = 0
+    required_chars = list(text)
+    for match in _EXCLUSION_PATTERN.finditer(text):
+        clause_end = _CLAUSE_END_PATTERN.search(text, match.end())
+        end = clause_end.start() if clause_end else len(text)
+        excluded |= attribute_bits(text[match.end():end])
+        required_chars[match.start():end] = " " * (end - match.start())
+    required_text = "".join(required_chars)
+
+    mentioned = attribute_bits(required_text)
+    requires_card = bool(
+        _CARD_PATTERN.search(required_text) and mentioned & (NETWORK_MASK | ISSUER_MASK)
+    )
+    requires_membership = bool(mentioned & MEMBERSHIP_MASK and _MEMBER_PATTERN.search(required_text))
+
+    return TermConstraints(
+        not_combinable_with=not_combinable,
+        standalone=standalone,
+        min_order=_amount(min_match.group(1)) if min_match else None,
+        max_discount=_amount(max_match.group(1)) if max_match else None,
+        eligibility_bits=mentioned,
+        excluded_bits=excluded,
+        requires_card=requires_card,
+        requires_membership=requires_membership,
+    )
+
+
+def parse_term(term: str) -> TermConstraints:
+    """Parse a term, reusing the cached result for previously seen term text"""
+    key = hashlib.blake2b(term.encode('utf-8'), digest_size=16).digest()
+    constraints = _TERM_CACHE.get(key)
+    if constraints is not None:
+        _TERM_CACHE.move_to_end(key)
+        _cache_stats["hits"] += 1
+        return constraints
+
+    _cache_stats["misses"] += 1
+    constraints = _parse_uncached(term)
+    _TERM_CACHE[key] = constraints
+    if len(_TERM_CACHE) > _TERM_CACHE_SIZE:
+        _TERM_CACHE.popitem(last=False)
+    return constraints
+
+
+def parse_terms(terms: List[str]) -> TermConstraints:
+    """Parse and merge all terms of a deal; the strictest limit wins"""
+    merged = TermConstraints()
+    for term in terms:
+        parsed = parse_term(term)
+        merged = TermConstraints(
+            not_combinable_with=merged.not_combinable_with | parsed.not_combinable_with,
+            standalone=merged.standalone or parsed.standalone,
+            min_order=_strictest(merged.min_order, parsed.min_order, max),
+            max_discount=_strictest(merged.max_discount, parsed.max_discount, min),
+            eligibility_bits=merged.eligibility_bits | parsed.eligibility_bits,
+            excluded_bits=merged.excluded_bits | parsed.excluded_bits,
+            requires_card=merged.requires_card or parsed.requires_card,
+            requires_membership=merged.requires_membership or parsed.requires_membership,
+        )
+    return merged
+
+
+def _strictest(current: Optional[float], new: Optional[float], pick: Any) -> Optional[float]:
+    if current is None:
+        return new
+    if new is None:
+        return current
+    return pick(current, new)
+
+
+def term_cache_info() -> Dict[str, int]:
+    """Term cache statistics"""
+    return {"size": len(_TERM_CACHE), **_cache_stats}
+
+
+__all__ = ["TermConstraints", "parse_term", "parse_terms", "term_cache_info"]
@@ -0,0 +1,184 @@
+"""
+Eligibility Bitsets - Compiled user and deal eligibility for StackSmart
+
+User context (cards, memberships) and deal requirements are compiled into
+integer bitsets once, so eligibility filtering becomes a mask check per deal.
+Each card gets its own bitset, because a deal is paid with one card: an HDFC
+Visa qualifies for "HDFC cards, not valid on Amex" even if the user also holds
+an Amex.
+"""
+
+import re
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+# Canonical eligibility attributes and the spellings that map onto them
+CARD_NETWORKS: Dict[str, List[str]] = {
+    "visa": ["visa"],
+    "mastercard": ["mastercard", "master card"],
+    "rupay": ["rupay"],
+    "amex": ["amex", "american express"],
+    "diners": ["diners", "diners club"],
+    "discover": ["discover"],
+}
+
+CARD_ISSUERS: Dict[str, List[str]] = {
+    "hdfc": ["hdfc"],
+    "icici": ["icici"],
+    "sbi": ["sbi", "state bank"],
+    "axis": ["axis"],
+    "kotak": ["kotak"],
+    "citi": ["citi", "citibank"],
+    "hsbc": ["hsbc"],
+    "indusind": ["indusind"],
+    "yes_bank": ["yes bank"],
+    "idfc": ["idfc"],
+    "rbl": ["rbl"],
+    "bob": ["bob", "bank of baroda"],
+    "au": ["au bank", "au small finance"],
+    "standard_chartered": ["standard chartered"],
+    "onecard": ["onecard", "one card"],
+}
+
+MEMBERSHIPS: Dict[str, List[str]] = {
+    "prime": ["prime", "amazon prime"],
+    "flipkart_plus": ["flipkart plus"],
+    "myntra_insider": ["myntra insider"],
+    "walmart_plus": ["walmart+", "walmart plus"],
+    "ebay_plus": ["ebay plus"],
+}
+
+ANY_CARD = 1 << 0
+ANY_MEMBERSHIP = 1 << 1
+
+
+def _assign_bits(groups: Iterable[Dict[str, List[str]]]) -> Dict[str, int]:
+    """Assign one bit per canonical attribute, after the two 'any' bits"""
+    bits: Dict[str, int] = {}
+    for group in groups:
+        for name in group:
+            bits[name] = 1 << (len(bits) + 2)
+    return bits
+
+
+ATTRIBUTE_BITS = _assign_bits([CARD_NETWORKS, CARD_ISSUERS, MEMBERSHIPS])
+
+
+def _group_mask(group: Dict[str, List[str]]) -> int:
+    mask = 0
+    for name in group:
+        mask |= ATTRIBUTE_BITS[name]
+    return mask
+
+
+NETWORK_MASK = _group_mask(CARD_NETWORKS)
+ISSUER_MASK = _group_mask(CARD_ISSUERS)
+MEMBERSHIP_MASK = _group_mask(MEMBERSHIPS)
+
+# Single alternation over every alias; longest aliases first so they win over prefixes
+_ALIASES: Dict[str, str] = {
+    alias: name
+    for group in (CARD_NETWORKS, CARD_ISSUERS, MEMBERSHIPS)
+    for name, aliases in group.items()
+    for alias in aliases
+}
+_ALIAS_PATTERN = re.compile(
+    r"(?<![a-z0-9])("
+    + "|".join(re.escape(alias) for alias in sorted(_ALIASES, key=len, reverse=True))
+    + r")(?![a-z0-9])"
+)
+
+
+def attribute_bits(text: str) -> int:
+    """Bitset of every card network, issuer and membership mentioned in `text`"""
+    bits = 0
+    for match in _ALIAS_PATTERN.finditer(text.lower()):
+        bits |= ATTRIBUTE_BITS[_ALIASES[match.group(1)]]
+    return bits
+
+
+def _entry_text(entry: Any) -> str:
+    """Flatten a card or membership entry (string or dict) into searchable text"""
+    if isinstance(entry, dict):
+        return " ".join(str(value) for value in entry.values() if value)
+    return str(entry)
+
+
+def compile_user_context(user_context: Dict[str, Any]) -> Tuple[int, ...]:
+    """
+    Compile a user's cards and memberships into one eligibility bitset per card
+
+    Memberships apply whichever card pays, so every bitset carries them. A user
+    without cards gets a single bitset holding only the memberships.
+    """
+    membership_bits = 0
+    memberships = user_context.get('memberships') or []
+    if memberships:
+        membership_bits |= ANY_MEMBERSHIP
+    for membership in memberships:
+        membership_bits |= attribute_bits(_entry_text(membership)) & MEMBERSHIP_MASK
+
+    cards = user_context.get('cards') or []
+    if not cards:
+        return (membership_bits,)
+    return tuple(
+        ANY_CARD | membership_bits | (attribute_bits(_entry_text(card)) & (NETWORK_MASK | ISSUER_MASK))
+        for card in cards
+    )
+
+
+def compile_deal_requirements(
+    mentioned: int,
+    requires_card: bool,
+    requires_membership: bool
+) -> Tuple[Tuple[int, int], ...]:
+    """
+    Compile a deal's eligibility requirements into (group, domain) mask pairs.
+
+    `mentioned` is the bitset of attributes named in the deal's terms. Each
+    group is an "any of" requirement and the groups are combined with "and".
+    A group with a domain is only enforced when the user's bitset says
+    something about that domain: a card whose network is not stated
+    ("HDFC Regalia") is unknown for the network group, not ineligible.
+    """
+    groups: List[Tuple[int, int]] = []
+    if requires_card:
+        groups.append((ANY_CARD, 0))
+        for mask in (NETWORK_MASK, ISSUER_MASK):
+            if mentioned & mask:
+                groups.append((mentioned & mask, mask))
+    if requires_membership:
+        groups.append((ANY_MEMBERSHIP, 0))
+        if mentioned & MEMBERSHIP_MASK:
+            groups.append((mentioned & MEMBERSHIP_MASK, 0))
+
+    return tuple(groups)
+
+
+def _card_is_eligible(requirements: Tuple[Tuple[int, int], ...], bits: int, excluded: int) -> bool:
+    if bits & excluded:
+        return False
+    return all(
+        group & bits or (domain and not domain & bits)
+        for group, domain in requirements
+    )
+
+
+def is_eligible(
+    requirements: Tuple[Tuple[int, int], ...],
+    user_bits: Optional[Tuple[int, ...]],
+    excluded: int = 0
+) -> bool:
+    """Whether some card of the user meets the deal's requirements without being excluded"""
+    if user_bits is None:
+        return True
+    return any(_card_is_eligible(requirements, bits, excluded) for bits in user_bits)
+
+
+__all__ = [
+    "compile_user_context",
+    "compile_deal_requirements",
+    "is_eligible",
+    "attribute_bits",
+    "ANY_CARD",
+    "ANY_MEMBERSHIP",
+]
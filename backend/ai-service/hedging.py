@@ -0,0 +1,120 @@
+"""
+Hedged Fetches - Duplicate slow retailer fetches after the platform's p95
+
+A small share of fetches hang far beyond the median. When a fetch has not
+answered by its platform's observed p95 latency, one duplicate request is
+started (the connection pool hands it a different connection) and whichever
+finishes first wins; the other is cancelled. A `RatioBudget` caps hedges at a
+few percent of fetches so hedging never adds meaningful load.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from rate_limit import RatioBudget
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class HedgePolicy:
+    """
+    Per-platform latency percentiles and the hedged fetch runner
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        max_hedge_ratio: float = 0.05,
+        min_samples: int = 20,
+        window: int = 200,
+        min_delay: float = 0.05
+    ):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window = window
+        self.min_delay = min_delay
+        self.budget = RatioBudget(max_hedge_ratio)
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._stats: Dict[str, int] = {"fetches": 0, "hedged": 0, "hedge_wins": 0}
+
+    def record(self, platform: str, seconds: float) -> None:
+        samples = self._latencies.get(platform)
+        if samples is None:
+            samples = self._latencies[platform] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def delay(self, platform: str) -> Optional[float]:
+        """Seconds to wait before hedging; None until enough latencies are known"""
+        samples = self._latencies.get(platform)
+        if samples is None or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile))
+        return max(self.min_delay, ordered[index])
+
+    async def run(self, platform: str, fetch: Callable[[], Awaitable[T]]) -> T:
+        """Run `fetch`, starting one duplicate if it is slower than the platform's p95"""
+        self._stats["fetches"] += 1
+        self.budget.deposit()
+        delay = self.delay(platform)
+        started = time.monotonic()
+        primary = asyncio.ensure_future(fetch())
+
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done or not self.budget.try_spend():
+                result = await primary
+                self.record(platform, time.monotonic() - started)
+                return result
+
+            self._stats["hedged"] += 1
+            logger.info(f"🔀 Hedging {platform} fetch after {delay:.2f}s")
+            hedge = asyncio.ensure_future(fetch())
+            return await self._first_success(platform, primary, hedge, started)
+        except BaseException:
+            primary.cancel()
+            raise
+
+    async def _first_success(
+        self,
+        platform: str,
+        primary: "asyncio.Future[T]",
+        hedge: "asyncio.Future[T]",
+        started: float
+    ) -> T:
+        """Result of whichever attempt succeeds first; the first error only if both fail"""
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # exception() on every finished attempt, so none is left unretrieved
+                succeeded = [attempt for attempt in done if attempt.exception() is None]
+                if succeeded:
+                    if succeeded[0] is hedge:
+                        self._stats["hedge_wins"] += 1
+                    return succeeded[0].result()
+                error = error or next(iter(done)).exception()
+            assert error is not None
+            raise error
+        finally:
+            # The primary's latency is at least this long; recording it keeps the p95 honest
+            self.record(platform, time.monotonic() - started)
+            for attempt in pending:
+                attempt.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "hedge_rate": self._stats["hedged"] / self._stats["fetches"] if self._stats["fetches"] else 0.0,
+            "budget": self.budget.get_stats(),
+            "delays": {platform: self.delay(platform) for platform in self._latencies},
+        }
+
+
+__all__ = ["HedgePolicy"]
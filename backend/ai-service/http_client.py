@@ -0,0 +1,346 @@
+"""
+Shared HTTP Client - Pooled, keep-alive HTTP client for retailer fetches
+
+One client is created per process (in the FastAPI lifespan) and reused by every
+fetch, so DNS lookups, TCP connections and TLS sessions are shared. Hosts that
+support it can be fetched over HTTP/2 when httpx and h2 are installed.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from typing import AsyncIterator, Awaitable, Callable, Dict, Any, Iterable, Optional, Protocol
+from urllib.parse import urljoin, urlparse
+
+import aiohttp
+
+try:
+    import httpx
+    import h2  # noqa: F401  # httpx needs h2 for HTTP/2 support
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+}
+
+
+class HTTPStatusError(Exception):
+    """A retailer answered with an unexpected HTTP status"""
+
+    def __init__(self, status: int):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+MAX_REDIRECTS = 10
+
+
+class DisallowedHostError(Exception):
+    """A request (or one of its redirects) targeted a host the caller does not allow"""
+
+
+def is_transport_error(error: BaseException) -> bool:
+    """Timeouts and connection failures: the retailer could not be reached or did not answer"""
+    if isinstance(error, (asyncio.TimeoutError, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)):
+        return True
+    return HTTP2_AVAILABLE and isinstance(error, httpx.TransportError)
+
+
+class HttpResponse(Protocol):
+    """Minimal response interface shared by the HTTP/1.1 and HTTP/2 backends"""
+
+    status: int
+    headers: Any  # Case-insensitive mapping; the backends use different types
+    url: str
+    http_version: str
+
+    def iter_chunks(self, chunk_size: int = 65536) -> AsyncIterator[bytes]: ...
+
+    async def read(self) -> bytes: ...
+
+    async def text(self) -> str: ...
+
+
+class _AiohttpResponse:
+    def __init__(self, response: aiohttp.ClientResponse):
+        self._response = response
+        self.status = response.status
+        self.headers = response.headers
+        self.url = str(response.url)
+        self.http_version = f"HTTP/{response.version.major}.{response.version.minor}" if response.version else "HTTP/1.1"
+
+    async def iter_chunks(self, chunk_size: int = 65536) -> AsyncIterator[bytes]:
+        async for chunk in self._response.content.iter_chunked(chunk_size):
+            yield chunk
+
+    async def read(self) -> bytes:
+        return await self._response.read()
+
+    async def text(self) -> str:
+        return await self._response.text()
+
+
+class _HttpxResponse:
+    def __init__(self, response: "httpx.Response", decompress: bool = True):
+        self._response = response
+        self._decompress = decompress
+        self.status = response.status_code
+        self.headers = response.headers
+        self.url = str(response.url)
+        self.http_version = response.http_version
+
+    async def iter_chunks(self, chunk_size: int = 65536) -> AsyncIterator[bytes]:
+        chunks = (
+            self._response.aiter_bytes(chunk_size) if self._decompress
+            else self._response.aiter_raw(chunk_size)
+        )
+        async for chunk in chunks:
+            yield chunk
+
+    async def read(self) -> bytes:
+        return await self._response.aread()
+
+    async def text(self) -> str:
+        await self._response.aread()
+        return self._response.text
+
+
+class SharedHttpClient:
+    """
+    Process-wide HTTP client with per-host connection pools and a DNS cache
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        dns_cache_ttl: int = 300,
+        keepalive_timeout: float = 30.0,
+        timeout: float = 10.0,
+        http2_hosts: Optional[Iterable[str]] = None,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self.http2_hosts = set(http2_hosts or []) if HTTP2_AVAILABLE else set()
+        self.headers = headers or DEFAULT_HEADERS
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._http2_client: Optional["httpx.AsyncClient"] = None
+        self._stats: Dict[str, float] = {
+            "requests": 0,
+            "http2_requests": 0,
+            "connections_created": 0,
+            "connections_reused": 0,
+            "pool_waits": 0,
+            "pool_wait_seconds_total": 0.0,
+            "pool_wait_seconds_max": 0.0,
+        }
+
+    async def start(self) -> None:
+        """Create the underlying sessions; must run inside the event loop"""
+        if self._session is not None:
+            return
+
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.dns_cache_ttl,
+            use_dns_cache=True,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            trace_configs=[self._build_trace_config()],
+        )
+
+        if self.http2_hosts:
+            self._http2_client = httpx.AsyncClient(
+                http2=True,
+                headers=self.headers,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.limit,
+                    max_keepalive_connections=self.limit_per_host * len(self.http2_hosts),
+                    keepalive_expiry=self.keepalive_timeout,
+                ),
+            )
+
+        logger.info(
+            f"🌐 HTTP client started (pool {self.limit}, {self.limit_per_host}/host, "
+            f"HTTP/2 hosts: {sorted(self.http2_hosts) or 'none'})"
+        )
+
+    async def close(self) -> None:
+        """Close pooled connections"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._http2_client is not None:
+            await self._http2_client.aclose()
+            self._http2_client = None
+
+    def _build_trace_config(self) -> aiohttp.TraceConfig:
+        """Trace hooks that count connection reuse and time spent waiting for the pool"""
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_connection_create_end(session: Any, ctx: SimpleNamespace, params: Any) -> None:
+            self._stats["connections_created"] += 1
+
+        async def on_connection_reuseconn(session: Any, ctx: SimpleNamespace, params: Any) -> None:
+            self._stats["connections_reused"] += 1
+
+        async def on_connection_queued_start(session: Any, ctx: SimpleNamespace, params: Any) -> None:
+            ctx.queued_at = time.monotonic()
+
+        async def on_connection_queued_end(session: Any, ctx: SimpleNamespace, params: Any) -> None:
+            waited = time.monotonic() - getattr(ctx, "queued_at", time.monotonic())
+            self._stats["pool_waits"] += 1
+            self._stats["pool_wait_seconds_total"] += waited
+            self._stats["pool_wait_seconds_max"] = max(self._stats["pool_wait_seconds_max"], waited)
+
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_config.on_connection_queued_start.append(on_connection_queued_start)
+        trace_config.on_connection_queued_end.append(on_connection_queued_end)
+        return trace_config
+
+    def _httpx_trace(self) -> Callable[[str, Dict[str, Any]], Awaitable[None]]:
+        """
+        Per-request httpcore trace hook counting new and reused HTTP/2 connections
+
+        httpcore reports no event for waiting on its pool, so pool wait metrics
+        only cover the aiohttp (HTTP/1.1) hosts.
+        """
+        connected = False
+
+        async def trace(event_name: str, info: Dict[str, Any]) -> None:
+            nonlocal connected
+            if event_name == "connection.connect_tcp.complete":
+                connected = True
+                self._stats["connections_created"] += 1
+            elif event_name.endswith(".send_request_headers.started") and not connected:
+                self._stats["connections_reused"] += 1
+
+        return trace
+
+    def _uses_http2(self, url: str) -> bool:
+        host = (urlparse(url).hostname or "").rstrip(".")
+        return any(host == http2_host or host.endswith("." + http2_host) for http2_host in self.http2_hosts)
+
+    @asynccontextmanager
+    async def _send(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]],
+        timeout: float,
+        decompress: bool,
+        follow_redirects: bool
+    ) -> AsyncIterator[HttpResponse]:
+        """One GET on whichever pool serves the URL's host"""
+        self._stats["requests"] += 1
+
+        if self._http2_client is not None and self._uses_http2(url):
+            self._stats["http2_requests"] += 1
+            request = self._http2_client.build_request(
+                "GET", url, headers=headers, timeout=timeout,
+                extensions={"trace": self._httpx_trace()},
+            )
+            h2_response = await self._http2_client.send(
+                request, stream=True, follow_redirects=follow_redirects
+            )
+            try:
+                yield _HttpxResponse(h2_response, decompress)
+            finally:
+                await h2_response.aclose()
+            return
+
+        assert self._session is not None
+        async with self._session.get(
+            url,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=timeout),
+            auto_decompress=decompress,
+            allow_redirects=follow_redirects,
+        ) as response:
+            yield _AiohttpResponse(response)
+
+    @asynccontextmanager
+    async def get(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        decompress: bool = True,
+        allowed_host: Optional[Callable[[str], bool]] = None
+    ) -> AsyncIterator[HttpResponse]:
+        """
+        Issue a GET over the shared pools and yield the streaming response
+
+        With `decompress=False` the body is yielded exactly as received (still
+        Content-Encoded), so callers can bound decompression themselves. With
+        `allowed_host`, the request and every redirect it follows must target
+        a host the predicate accepts, or DisallowedHostError is raised.
+        """
+        if allowed_host is not None and not allowed_host(urlparse(url).hostname or ""):
+            raise DisallowedHostError(f"Refusing to fetch {urlparse(url).hostname}")
+        if self._session is None:
+            await self.start()
+
+        redirects = 0
+        while True:
+            # Redirects are followed here when hosts are restricted, so each hop can be checked
+            async with self._send(
+                url, headers, timeout or self.timeout, decompress, follow_redirects=allowed_host is None
+            ) as response:
+                location = response.headers.get("Location")
+                if allowed_host is None or response.status not in REDIRECT_STATUSES or not location:
+                    yield response
+                    return
+            redirects += 1
+            if redirects > MAX_REDIRECTS:
+                raise aiohttp.ClientError(f"Too many redirects fetching {url}")
+            url = urljoin(response.url, location)
+            if urlparse(url).scheme not in ("http", "https") or not allowed_host(urlparse(url).hostname or ""):
+                raise DisallowedHostError(f"Refusing redirect to {urlparse(url).hostname}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Connection reuse (all hosts) and pool wait (HTTP/1.1 hosts) metrics"""
+        connections = self._stats["connections_created"] + self._stats["connections_reused"]
+        pool_waits = self._stats["pool_waits"]
+        return {
+            **self._stats,
+            "connection_reuse_rate": (
+                self._stats["connections_reused"] / connections if connections else 0.0
+            ),
+            "pool_wait_seconds_avg": (
+                self._stats["pool_wait_seconds_total"] / pool_waits if pool_waits else 0.0
+            ),
+            "http2_enabled": bool(self._http2_client),
+            "pool_wait_measured_hosts": "http/1.1 only" if self._http2_client else "all",
+        }
+
+
+__all__ = [
+    "SharedHttpClient",
+    "HttpResponse",
+    "HTTPStatusError",
+    "DisallowedHostError",
+    "is_transport_error",
+    "HTTP2_AVAILABLE",
+]
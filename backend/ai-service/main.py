@@ -1,22 +1,27 @@
 import uvicorn
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from contextlib import asynccontextmanager
 import logging
 
 # Local module imports
 try:
     from config import settings
-    from models import ProductURL, PricePredictionRequest, DealStackRequest, ValidationRequest, ProductAnalysisRequest
+    from models import ProductURL, PricePredictionRequest, DealStackRequest, ValidationRequest, BatchValidationRequest, ProductAnalysisRequest, PriceComparisonRequest
     from services import (
         get_product_details,
         predict_price_service,
         stack_deals_service,
         validate_stack_service,
+        validate_stacks_service,
         analyze_product_service,
         get_real_time_deals,
         detect_product_details,
+        compare_prices_stream_service,
         optimize_deals_service,
+        optimize_deals_frontier_service,
+        get_service_metrics,
         startup_event,
         shutdown_event,
     )
@@ -106,6 +111,18 @@ async def validate_stack(request: ValidationRequest):
         logger.error(f"Error validating stack: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/validate-stacks")
+async def validate_stacks(request: BatchValidationRequest):
+    """
+    Validates several candidate deal stacks in one call.
+    """
+    try:
+        validation_results = await validate_stacks_service(request)
+        return validation_results
+    except Exception as e:
+        logger.error(f"Error validating stacks: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/analyze-product")
 async def analyze_product(request: ProductAnalysisRequest):
     """
@@ -142,6 +159,17 @@ async def detect_product_details_endpoint(request: ProductURL):
         logger.error(f"Error detecting product details: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/compare-prices/stream")
+async def compare_prices_stream(request: PriceComparisonRequest):
+    """
+    Streams price comparison results as server-sent events.
+    """
+    return StreamingResponse(
+        compare_prices_stream_service(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @app.post("/optimize-deals")
 async def optimize_deals(request: DealStackRequest):
     """
@@ -154,6 +182,25 @@ async def optimize_deals(request: DealStackRequest):
         logger.error(f"Error optimizing deals: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/optimize-deals/frontier")
+async def optimize_deals_frontier(request: DealStackRequest):
+    """
+    Returns the Pareto frontier of deal stacks and the best stack for the user's preferences.
+    """
+    try:
+        return await optimize_deals_frontier_service(request)
+    except Exception as e:
+        logger.error(f"Error computing deal frontier: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Operational metrics (connection reuse, pool waits, ...). Async so the stats
+    are read on the event loop that updates them.
+    """
+    return get_service_metrics()
+
 @app.get("/health")
 def health_check():
     """
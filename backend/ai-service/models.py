@@ -17,8 +17,18 @@ class ValidationRequest(BaseModel):
     deal_stack: List[Dict[Any, Any]]
     product_url: str
 
+class BatchValidationRequest(BaseModel):
+    stacks: List[List[Dict[Any, Any]]]
+    base_price: float
+
 class ProductAnalysisRequest(BaseModel):
     product_url: str
 
+class PriceComparisonRequest(BaseModel):
+    product_name: str
+    product_urls: List[str]
+    user_location: Optional[Dict[str, str]] = None
+    deadline: Optional[float] = None  # Seconds; defaults to settings.compare_deadline
+
 def get_model_manager():
     pass
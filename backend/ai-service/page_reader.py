@@ -0,0 +1,152 @@
+"""
+Page Reader - Streaming, size-capped reading of retailer pages
+
+Bodies are read chunk by chunk, decompressed and decoded incrementally, and fed
+to a consumer that can stop the download as soon as it has what it needs. The
+decoded size is capped and decompression is bounded per chunk, so a page never
+costs more than the cap in memory and a decompression bomb is rejected before
+it expands.
+"""
+
+import codecs
+import zlib
+from dataclasses import dataclass
+from typing import Any, Optional, Protocol
+
+from parse_executor import InlineLane
+
+
+class PageConsumer(Protocol):
+    """Receives decoded page text; returns True once it needs no more"""
+
+    def feed(self, text: str, final: bool = False) -> bool: ...
+
+
+class DecompressionBombError(Exception):
+    """Raised when a body expands far beyond any plausible HTML compression ratio"""
+
+
+@dataclass
+class PageReadResult:
+    wire_bytes: int = 0  # Bytes received from the network
+    decoded_bytes: int = 0  # Bytes after Content-Encoding was removed
+    early_exit: bool = False  # The consumer finished before the end of the body
+    truncated: bool = False  # The size cap was reached
+
+
+def _charset(headers: Any) -> str:
+    content_type = headers.get("Content-Type", "") or ""
+    for param in content_type.split(";")[1:]:
+        name, _, value = param.strip().partition("=")
+        if name.lower() == "charset" and value:
+            charset = value.strip("\"' ")
+            try:
+                codecs.lookup(charset)
+                return charset
+            except LookupError:
+                break
+    return "utf-8"
+
+
+def _decompressor(headers: Any) -> Optional[Any]:
+    encoding = (headers.get("Content-Encoding", "") or "").strip().lower()
+    if encoding in ("", "identity"):
+        return None
+    if encoding in ("gzip", "x-gzip", "deflate"):
+        # 32 + MAX_WBITS auto-detects gzip and zlib headers
+        return zlib.decompressobj(32 + zlib.MAX_WBITS)
+    raise ValueError(f"Unsupported Content-Encoding: {encoding}")
+
+
+class _PageStream:
+    """Per-page decompression, decoding and size accounting for `read_page`"""
+
+    def __init__(self, headers: Any, consumer: PageConsumer, max_bytes: int, max_compression_ratio: float):
+        self.consumer = consumer
+        self.max_bytes = max_bytes
+        self.max_compression_ratio = max_compression_ratio
+        self.result = PageReadResult()
+        self._decompressor = _decompressor(headers)
+        self._decoder = codecs.getincrementaldecoder(_charset(headers))(errors="replace")
+        self._compressed_consumed = 0
+
+    def process(self, chunk: bytes) -> Optional[PageReadResult]:
+        """Feed one wire chunk to the consumer; returns the result once reading should stop"""
+        result = self.result
+        result.wire_bytes += len(chunk)
+        decompressor = self._decompressor
+        if decompressor is not None:
+            # Never inflate more than the remaining budget (+1 byte to detect overflow)
+            inflated = decompressor.decompress(chunk, self.max_bytes - result.decoded_bytes + 1)
+            self._compressed_consumed += len(chunk) - len(decompressor.unconsumed_tail)
+            if result.decoded_bytes + len(inflated) > self.max_compression_ratio * max(self._compressed_consumed, 1024):
+                raise DecompressionBombError(
+                    f"{result.decoded_bytes + len(inflated)} bytes inflated "
+                    f"from {self._compressed_consumed} compressed bytes"
+                )
+            if decompressor.unconsumed_tail:
+                result.truncated = True
+            chunk = inflated
+        result.decoded_bytes += len(chunk)
+
+        if result.decoded_bytes > self.max_bytes:
+            chunk = chunk[:len(chunk) - (result.decoded_bytes - self.max_bytes)]
+            result.decoded_bytes = self.max_bytes
+            result.truncated = True
+
+        if result.truncated:
+            self.consumer.feed(self._decoder.decode(chunk, final=True), final=True)
+            return result
+
+        if self.consumer.feed(self._decoder.decode(chunk)):
+            result.early_exit = True
+            self.consumer.feed(self._decoder.decode(b"", final=True), final=True)
+            return result
+        return None
+
+    def finish(self) -> PageReadResult:
+        """The body ended: flush the decompressor and decoder"""
+        tail = self._decompressor.flush() if self._decompressor is not None else b""
+        tail = tail[:self.max_bytes - self.result.decoded_bytes]
+        self.result.decoded_bytes += len(tail)
+        self.consumer.feed(self._decoder.decode(tail, final=True), final=True)
+        return self.result
+
+
+async def read_page(
+    response: Any,
+    consumer: PageConsumer,
+    max_bytes: int = 4 * 1024 * 1024,
+    max_compression_ratio: float = 200.0,
+    chunk_size: int = 32 * 1024,
+    lane: Optional[Any] = None
+) -> PageReadResult:
+    """
+    Stream a response body (fetched with decompress=False) into `consumer`
+
+    Stops when the consumer is done, the body ends, or `max_bytes` of decoded
+    content have been read. Raises DecompressionBombError when the expansion
+    ratio exceeds `max_compression_ratio`. With a `parse_executor` lane, each
+    chunk is decompressed, decoded and consumed on that lane's worker, and
+    `consumer` must have been built there with `lane.create`.
+    """
+    lane = lane or InlineLane()
+    # Only what _PageStream reads, so the headers can be sent to a worker process
+    headers = {name: response.headers.get(name) for name in ("Content-Type", "Content-Encoding")}
+    stream = await lane.create(_PageStream, headers, consumer, max_bytes, max_compression_ratio)
+    try:
+        async for chunk in response.iter_chunks(chunk_size):
+            result = await lane.call(stream, "process", chunk)
+            if result is not None:
+                return result
+        return await lane.call(stream, "finish")
+    finally:
+        lane.release(stream)
+
+
+__all__ = [
+    "read_page",
+    "PageConsumer",
+    "PageReadResult",
+    "DecompressionBombError",
+]
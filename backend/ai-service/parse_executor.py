@@ -0,0 +1,229 @@
+"""
+Parse Executor - Off-loop page decoding and parsing
+
+Decompression, decoding, regex scanning and lxml parsing of streamed pages
+run on workers so the event loop only does I/O and coordination. Each page is
+pinned to one worker ("lane") because its parser state is not safe to move
+between workers, and a semaphore bounds the number of queued and running
+parse jobs so a burst of pages waits instead of piling up.
+
+Workers are threads or, with `processes=True`, single-process pools. The
+incremental lxml parser and the regex scanners hold the GIL, so threads keep
+the loop responsive but parse no faster than one core; processes parse pages
+in parallel at the cost of pickling each chunk. A page's parser state is
+created inside its worker (`ParseLane.create`) and used through the returned
+reference (`ParseLane.call`), so it never has to be pickled.
+
+`LoopLagMonitor` measures how late the event loop wakes up from a short
+sleep, which is the delay every other request on the worker sees.
+"""
+
+import asyncio
+import itertools
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class RemoteRef(NamedTuple):
+    """Handle to an object living in a parse worker process"""
+    ident: int
+
+
+# Objects owned by this process when it is a parse worker
+_objects: Dict[int, Any] = {}
+_object_ids = itertools.count()
+
+
+def _resolve(value: Any) -> Any:
+    return _objects[value.ident] if isinstance(value, RemoteRef) else value
+
+
+def _remote_create(factory: Callable[..., Any], args: Tuple[Any, ...]) -> RemoteRef:
+    ref = RemoteRef(next(_object_ids))
+    _objects[ref.ident] = factory(*(_resolve(arg) for arg in args))
+    return ref
+
+
+def _remote_call(ref: RemoteRef, method: str, args: Tuple[Any, ...]) -> Any:
+    return getattr(_objects[ref.ident], method)(*args)
+
+
+def _remote_release(refs: Tuple[RemoteRef, ...]) -> None:
+    for ref in refs:
+        _objects.pop(ref.ident, None)
+
+
+class ParseLane:
+    """One page's view of the executor: every job runs on the same worker"""
+
+    def __init__(self, executor: "ParseExecutor", worker: Executor):
+        self._executor = executor
+        self._worker = worker
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        return await self._executor._submit(self._worker, fn, *args)
+
+    async def create(self, factory: Callable[..., Any], *args: Any) -> Any:
+        """Build a stateful object on this lane's worker; use it through `call`"""
+        if self._executor.processes:
+            return await self.run(_remote_create, factory, args)
+        return await self.run(factory, *args)
+
+    async def call(self, target: Any, method: str, *args: Any) -> Any:
+        """Call a method of an object built by `create`, on this lane's worker"""
+        if self._executor.processes:
+            return await self.run(_remote_call, target, method, args)
+        return await self.run(getattr(target, method), *args)
+
+    def release(self, *targets: Any) -> None:
+        """Drop objects built by `create` once their page is done"""
+        if self._executor.processes:
+            # Queued behind the lane's earlier jobs; nothing to wait for
+            self._worker.submit(_remote_release, targets)
+
+
+class ParseExecutor:
+    """
+    Worker threads or processes for page parsing with a bounded job queue
+    """
+
+    def __init__(self, workers: int = 4, max_queue: int = 64, processes: bool = False):
+        self.max_queue = max_queue
+        self.processes = processes
+        self._workers: List[Executor]
+        if processes:
+            # Spawned, not forked: the parent runs an event loop and pool threads
+            context = multiprocessing.get_context("spawn")
+            self._workers = [
+                ProcessPoolExecutor(max_workers=1, mp_context=context) for _ in range(workers)
+            ]
+        else:
+            self._workers = [
+                ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"parse-{index}")
+                for index in range(workers)
+            ]
+        self._next_worker = itertools.cycle(self._workers)
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._stats: Dict[str, float] = {
+            "jobs": 0,
+            "queued": 0,
+            "queue_wait_seconds_max": 0.0,
+            "run_seconds_total": 0.0,
+            "run_seconds_max": 0.0,
+        }
+
+    async def start(self) -> None:
+        """Start worker processes now rather than on the first page"""
+        if self.processes:
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*(loop.run_in_executor(worker, int) for worker in self._workers))
+
+    def lane(self) -> ParseLane:
+        """Pick a worker for one page"""
+        return ParseLane(self, next(self._next_worker))
+
+    async def _submit(self, worker: Executor, fn: Callable[..., T], *args: Any) -> T:
+        if self._slots is None:
+            # Created lazily so it binds to the running loop
+            self._slots = asyncio.Semaphore(self.max_queue)
+
+        queued_at = time.monotonic()
+        self._stats["queued"] += 1
+        try:
+            async with self._slots:
+                waited = time.monotonic() - queued_at
+                self._stats["queue_wait_seconds_max"] = max(self._stats["queue_wait_seconds_max"], waited)
+                started = time.monotonic()
+                try:
+                    return await asyncio.get_running_loop().run_in_executor(worker, fn, *args)
+                finally:
+                    elapsed = time.monotonic() - started
+                    self._stats["jobs"] += 1
+                    self._stats["run_seconds_total"] += elapsed
+                    self._stats["run_seconds_max"] = max(self._stats["run_seconds_max"], elapsed)
+        finally:
+            self._stats["queued"] -= 1
+
+    def close(self) -> None:
+        for worker in self._workers:
+            worker.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        jobs = self._stats["jobs"]
+        return {
+            "workers": len(self._workers),
+            "processes": self.processes,
+            "max_queue": self.max_queue,
+            **self._stats,
+            "run_seconds_avg": self._stats["run_seconds_total"] / jobs if jobs else 0.0,
+        }
+
+
+class InlineLane:
+    """Lane that runs jobs directly on the event loop (parse workers disabled)"""
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        return fn(*args)
+
+    async def create(self, factory: Callable[..., Any], *args: Any) -> Any:
+        return factory(*args)
+
+    async def call(self, target: Any, method: str, *args: Any) -> Any:
+        return getattr(target, method)(*args)
+
+    def release(self, *targets: Any) -> None:
+        pass
+
+
+class LoopLagMonitor:
+    """
+    Event-loop lag: how much later than requested a short sleep returns
+    """
+
+    def __init__(self, interval: float = 0.1, window: int = 600):
+        self.interval = interval
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._max = 0.0
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - started - self.interval)
+            self._samples.append(lag)
+            self._max = max(self._max, lag)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Lag over the recent window, in milliseconds"""
+        samples = sorted(self._samples)
+        if not samples:
+            return {"samples": 0}
+        return {
+            "samples": len(samples),
+            "lag_ms_avg": 1000 * sum(samples) / len(samples),
+            "lag_ms_p99": 1000 * samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+            "lag_ms_max": 1000 * samples[-1],
+            "lag_ms_max_since_start": 1000 * self._max,
+        }
+
+
+__all__ = ["ParseExecutor", "ParseLane", "InlineLane", "RemoteRef", "LoopLagMonitor"]
@@ -7,16 +7,36 @@ factoring in shipping, taxes, and final checkout savings.
 
 import logging
 import asyncio
-import aiohttp
-from typing import List, Dict, Any, Optional, Tuple
-from dataclasses import dataclass
+from typing import AsyncIterator, List, Dict, Any, Optional, Set, Tuple, Union
+from dataclasses import dataclass, field, fields, replace
 from datetime import datetime, timedelta
-import re
-from urllib.parse import urlparse
+import json
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
 import hashlib
 
+from http_client import HTTPStatusError, SharedHttpClient
+from rate_limit import FetchLimiter
+from hedging import HedgePolicy
+from retry import RetryPolicy
+from circuit_breaker import (
+    CircuitBreakers, CircuitOpenError, FailureCache, RecentlyFailedError, is_platform_failure
+)
+from singleflight import SingleFlight, RedisSingleFlight, coalesce
+from tinylfu_cache import TinyLFUCache
+from two_tier_cache import TwoTierCache
+from volatility import PriceVolatilityTracker
+from refresh_scheduler import RefreshScheduler, RefreshTarget
+from page_reader import PageReadResult, read_page
+from parse_executor import InlineLane, LoopLagMonitor, ParseExecutor
+from selector_extraction import PageExtractor
+
 logger = logging.getLogger(__name__)
 
+# Query parameters that never change which product a URL points at
+TRACKING_PARAMS = {
+    "ref", "ref_", "tag", "affid", "affExtParam1", "affExtParam2", "gclid", "fbclid",
+    "pf_rd_p", "pf_rd_r", "pd_rd_w", "pd_rd_r", "pd_rd_wg", "psc", "smid", "th",
+}
 
 @dataclass
 class PlatformPrice:
@@ -32,6 +52,73 @@ class PlatformPrice:
     last_updated: datetime
     deals: List[Dict[str, Any]]
     confidence: float = 1.0
+    stale: bool = False  # Served past its TTL while a refresh runs in the background
+
+
+@dataclass
+class CachedPrice:
+    price: PlatformPrice
+    fetched_at: datetime
+    ttl: timedelta
+    validators: Dict[str, str] = field(default_factory=dict)  # ETag / Last-Modified of the fetched page
+
+
+# Response validators kept with a cached price, and the request headers that send them back
+CONDITIONAL_HEADERS = {
+    "ETag": "If-None-Match",
+    "Last-Modified": "If-Modified-Since",
+}
+
+
+_PLATFORM_PRICE_FIELDS = [f.name for f in fields(PlatformPrice)]
+
+
+def _platform_price_values(price: PlatformPrice) -> List[Any]:
+    """PlatformPrice as a positional list (field names are implied by order)"""
+    values = [getattr(price, name) for name in _PLATFORM_PRICE_FIELDS]
+    values[_PLATFORM_PRICE_FIELDS.index("last_updated")] = price.last_updated.timestamp()
+    return values
+
+
+def _platform_price_from_values(values: List[Any]) -> PlatformPrice:
+    values = list(values)
+    index = _PLATFORM_PRICE_FIELDS.index("last_updated")
+    values[index] = datetime.fromtimestamp(values[index])
+    return PlatformPrice(*values)
+
+
+def encode_platform_price(price: PlatformPrice) -> bytes:
+    """Compactly serialize a PlatformPrice for sharing between workers"""
+    return json.dumps(_platform_price_values(price), separators=(',', ':')).encode('utf-8')
+
+
+def decode_platform_price(payload: bytes) -> PlatformPrice:
+    """Deserialize a PlatformPrice produced by encode_platform_price"""
+    return _platform_price_from_values(json.loads(payload))
+
+
+def encode_cached_price(entry: CachedPrice) -> bytes:
+    """Compactly serialize a CachedPrice for the shared cache tier"""
+    return json.dumps(
+        [
+            entry.fetched_at.timestamp(),
+            entry.ttl.total_seconds(),
+            _platform_price_values(entry.price),
+            entry.validators,
+        ],
+        separators=(',', ':')
+    ).encode('utf-8')
+
+
+def decode_cached_price(payload: bytes) -> CachedPrice:
+    """Deserialize a CachedPrice produced by encode_cached_price"""
+    fetched_at, ttl, values, *rest = json.loads(payload)
+    return CachedPrice(
+        price=_platform_price_from_values(values),
+        fetched_at=datetime.fromtimestamp(fetched_at),
+        ttl=timedelta(seconds=ttl),
+        validators=rest[0] if rest else {}
+    )
 
 
 @dataclass
@@ -45,6 +132,9 @@ class PriceComparisonResult:
     price_range: Tuple[float, float]
     last_updated: datetime
     processing_time: float
+    stale: bool = False  # At least one platform price was served stale
+    age_seconds: float = 0.0  # Age of the oldest platform price used
+    missing_platforms: List[str] = field(default_factory=list)  # Requested platforms without a price
 
 
 class PriceComparisonService:
@@ -52,20 +142,149 @@ class PriceComparisonService:
     Real-time price comparison service across multiple platforms
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        http_client: Optional[SharedHttpClient] = None,
+        http_options: Optional[Dict[str, Any]] = None,
+        max_in_flight: int = 50,
+        redis_client: Optional[Any] = None,
+        cache_max_entries: int = 10_000,
+        cache_max_bytes: Optional[int] = 64 * 1024 * 1024,
+        platform_cache_max_entries: int = 50_000,
+        platform_cache_max_bytes: Optional[int] = 128 * 1024 * 1024,
+        stale_while_revalidate: bool = True,
+        max_staleness: timedelta = timedelta(hours=1),
+        volatility_tracker: Optional[PriceVolatilityTracker] = None,
+        refresh_options: Optional[Dict[str, Any]] = None,
+        max_page_bytes: int = 4 * 1024 * 1024,
+        max_compression_ratio: float = 200.0,
+        compare_deadline: Optional[float] = None,
+        hedge_options: Optional[Dict[str, Any]] = None,
+        breaker_options: Optional[Dict[str, Any]] = None,
+        retry_options: Optional[Dict[str, Any]] = None,
+        negative_cache_ttl: float = 30.0,
+        parse_workers: int = 4,
+        parse_max_queue: int = 64,
+        parse_processes: bool = False,
+        loop_lag_interval: float = 0.1
+    ):
         self.platform_configs = self._load_platform_configs()
-        self.cache: Dict[str, Tuple[Any, Any]] = {}
+        self.cache = TinyLFUCache(max_entries=cache_max_entries, max_bytes=cache_max_bytes)
         self.cache_duration = timedelta(minutes=10)
+        self.stale_while_revalidate = stale_while_revalidate
+        self.compare_deadline = compare_deadline
+        self.max_staleness = max_staleness
+        self._background_tasks: Set["asyncio.Task[Any]"] = set()
+        self._conditional_stats: Dict[str, int] = {"conditional_requests": 0, "not_modified": 0}
+        self.max_page_bytes = max_page_bytes
+        self.max_compression_ratio = max_compression_ratio
+        self._page_stats: Dict[str, int] = {
+            "pages": 0,
+            "wire_bytes": 0,
+            "decoded_bytes": 0,
+            "early_exits": 0,
+            "truncated": 0,
+        }
+        # Page decoding and parsing run on worker threads (or processes); 0 workers keeps them on the loop
+        self.parse_executor = (
+            ParseExecutor(parse_workers, parse_max_queue, parse_processes) if parse_workers > 0 else None
+        )
+        self.loop_lag = LoopLagMonitor(loop_lag_interval)
+        self.volatility = volatility_tracker or PriceVolatilityTracker()
+        self.refresh_scheduler = RefreshScheduler(
+            refresh=self._refresh_target,
+            change_rate=self.volatility.change_rate,
+            **(refresh_options or {})
+        )
+        self.platform_cache = TinyLFUCache(
+            max_entries=platform_cache_max_entries, max_bytes=platform_cache_max_bytes
+        )
+        self.price_store = TwoTierCache(
+            self.platform_cache, redis_client, encode_cached_price, decode_cached_price
+        )
+        self.http_client = http_client or SharedHttpClient(
+            http2_hosts=[key for key, config in self.platform_configs.items() if config.get("http2")],
+            **(http_options or {})
+        )
+        self.fetch_limiter = FetchLimiter(self.platform_configs, max_in_flight)
+        # Duplicate fetches slower than the platform's p95; None disables hedging
+        self.hedging = HedgePolicy(**hedge_options) if hedge_options is not None else None
+        self.retry_policy = RetryPolicy(**(retry_options or {}))
+        self.circuit_breakers = CircuitBreakers(**(breaker_options or {}))
+        self.failed_urls = FailureCache(ttl=negative_cache_ttl)
+        self.redis = redis_client
+        self.single_flight = SingleFlight()
+        self.redis_single_flight = RedisSingleFlight(
+            redis_client, encode_platform_price, decode_platform_price
+        ) if redis_client is not None else None
+    
+    async def start(self) -> None:
+        """Open the shared HTTP client; call once from the application lifespan"""
+        await self.http_client.start()
+        await self.price_store.start()
+        await self.refresh_scheduler.start()
+        if self.parse_executor is not None:
+            await self.parse_executor.start()
+        await self.loop_lag.start()
+    
+    async def close(self) -> None:
+        """Cancel background refreshes and close the shared HTTP client"""
+        await self.refresh_scheduler.close()
+        await self.loop_lag.close()
+        for task in list(self._background_tasks):
+            task.cancel()
+        await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        await self.single_flight.close()
+        await self.http_client.close()
+        await self.price_store.close()
+        if self.redis is not None:
+            await self.redis.aclose()
+        if self.parse_executor is not None:
+            self.parse_executor.close()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Operational metrics for the price comparison pipeline"""
+        return {
+            "http": self.http_client.get_stats(),
+            "cache": self.cache.get_stats(),
+            "platform_cache": self.price_store.get_stats(),
+            "limits": self.fetch_limiter.get_stats(),
+            "hedging": self.hedging.get_stats() if self.hedging else None,
+            "retries": self.retry_policy.get_stats(),
+            "circuit_breakers": self.circuit_breakers.get_stats(),
+            "negative_cache": self.failed_urls.get_stats(),
+            "single_flight": self.single_flight.get_stats(),
+            "background_refreshes": len(self._background_tasks),
+            "conditional": dict(self._conditional_stats),
+            "pages": {
+                **self._page_stats,
+                "wire_bytes_avg": (
+                    self._page_stats["wire_bytes"] / self._page_stats["pages"]
+                    if self._page_stats["pages"] else 0.0
+                ),
+            },
+            "parse_executor": self.parse_executor.get_stats() if self.parse_executor else None,
+            "loop_lag": self.loop_lag.get_stats(),
+            "volatility": self.volatility.get_stats(),
+            "refresh_scheduler": self.refresh_scheduler.get_stats(),
+            "redis_single_flight": (
+                self.redis_single_flight.get_stats() if self.redis_single_flight else None
+            ),
+        }
         
     def _load_platform_configs(self) -> Dict[str, Dict[str, Any]]:
         """Load platform-specific configuration"""
         return {
             "amazon.in": {
                 "name": "Amazon India",
+                "http2": True,
                 "base_shipping": 0.0,  # Free shipping for Prime
                 "tax_rate": 0.18,  # GST
                 "currency": "INR",
                 "api_endpoint": None,  # Would use Product Advertising API
+                "concurrency": 6,  # Simultaneous fetches
+                "rate_limit": {"rate": 5.0, "burst": 10},  # Requests per second
+                "cache_ttl": 300,  # Seconds a fetched price stays fresh
                 "selectors": {
                     "price": ".a-price-whole, .a-price .a-offscreen",
                     "shipping": ".a-color-secondary",
@@ -74,10 +293,14 @@ class PriceComparisonService:
             },
             "flipkart.com": {
                 "name": "Flipkart",
+                "http2": True,
                 "base_shipping": 40.0,
                 "tax_rate": 0.18,
                 "currency": "INR",
                 "api_endpoint": None,
+                "concurrency": 6,  # Simultaneous fetches
+                "rate_limit": {"rate": 5.0, "burst": 10},  # Requests per second
+                "cache_ttl": 300,  # Seconds a fetched price stays fresh
                 "selectors": {
                     "price": "._25b18c, ._30jeq3 ._16Jk6d",
                     "shipping": "._2Kn22P",
@@ -90,6 +313,9 @@ class PriceComparisonService:
                 "tax_rate": 0.18,
                 "currency": "INR",
                 "api_endpoint": None,
+                "concurrency": 4,  # Simultaneous fetches
+                "rate_limit": {"rate": 3.0, "burst": 6},  # Requests per second
+                "cache_ttl": 900,  # Seconds a fetched price stays fresh
                 "selectors": {
                     "price": ".pdp-price",
                     "shipping": ".shipping-info",
@@ -102,6 +328,9 @@ class PriceComparisonService:
                 "tax_rate": 0.18,
                 "currency": "INR",
                 "api_endpoint": None,
+                "concurrency": 4,  # Simultaneous fetches
+                "rate_limit": {"rate": 2.0, "burst": 4},  # Requests per second
+                "cache_ttl": 600,  # Seconds a fetched price stays fresh
                 "selectors": {
                     "price": ".u-flL",
                     "shipping": ".vi-price .u-flL",
@@ -114,6 +343,9 @@ class PriceComparisonService:
                 "tax_rate": 0.08,  # Average US sales tax
                 "currency": "USD",
                 "api_endpoint": None,
+                "concurrency": 4,  # Simultaneous fetches
+                "rate_limit": {"rate": 2.0, "burst": 4},  # Requests per second
+                "cache_ttl": 600,  # Seconds a fetched price stays fresh
                 "selectors": {
                     "price": "[data-automation-id='product-price']",
                     "shipping": ".shipping-info",
@@ -126,40 +358,94 @@ class PriceComparisonService:
         self, 
         product_name: str,
         product_urls: List[str],
-        user_location: Optional[Dict[str, str]] = None
+        user_location: Optional[Dict[str, str]] = None,
+        deadline: Optional[float] = None
     ) -> PriceComparisonResult:
         """
         Compare prices across multiple platforms
+        
+        `deadline` (seconds, default `compare_deadline`) bounds the whole
+        comparison: platforms that have not answered by then are cancelled and
+        listed in `missing_platforms`.
+        """
+        result: Optional[PriceComparisonResult] = None
+        async for item in self.compare_prices_stream(product_name, product_urls, user_location, deadline):
+            if isinstance(item, PriceComparisonResult):
+                result = item
+        assert result is not None
+        return result
+    
+    async def compare_prices_stream(
+        self,
+        product_name: str,
+        product_urls: List[str],
+        user_location: Optional[Dict[str, str]] = None,
+        deadline: Optional[float] = None
+    ) -> AsyncIterator[Union[PlatformPrice, PriceComparisonResult]]:
+        """
+        Compare prices across multiple platforms, yielding each PlatformPrice
+        as soon as it arrives and the PriceComparisonResult summary last
+        
+        Closing the generator early, or reaching the deadline, cancels the
+        platform fetches still waiting; shared in-flight fetches keep running
+        and are cached for later requests.
         """
         start_time = datetime.now()
+        deadline = self.compare_deadline if deadline is None else deadline
+        deadline_at = asyncio.get_running_loop().time() + deadline if deadline is not None else None
+        price_tasks: Dict["asyncio.Task[Any]", str] = {}
         
         try:
             # Check cache first
-            cache_key = self._generate_cache_key(product_name, product_urls)
-            if cache_key in self.cache:
-                cached_result, cache_time = self.cache[cache_key]
+            cache_key = self._generate_cache_key(product_name, product_urls, user_location)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                cached_result, cache_time = cached
                 if datetime.now() - cache_time < self.cache_duration:
                     logger.info(f"💰 Price comparison: Using cached result for {product_name}")
-                    return cached_result
+                    for price in cached_result.comparisons:
+                        yield price
+                    yield replace(
+                        cached_result,
+                        age_seconds=cached_result.age_seconds + (datetime.now() - cache_time).total_seconds()
+                    )
+                    return
+                self.cache.pop(cache_key)
             
-            # Fetch prices from all platforms
-            price_tasks: List[asyncio.Task[Any]] = []
+            # Fetch prices from all platforms; fresh per-platform entries are reused
             for url in product_urls:
                 platform = self._identify_platform(url)
                 if platform:
                     task = asyncio.create_task(self._fetch_platform_price(url, platform, user_location))
-                    price_tasks.append(task)
+                    price_tasks[task] = self.platform_configs[platform]["name"]
             
-            # Execute all price fetching tasks concurrently
-            platform_prices = await asyncio.gather(*price_tasks, return_exceptions=True)
-            
-            # Filter successful results
+            # Hand out prices in completion order until all answered or the deadline passes
             valid_prices: List[PlatformPrice] = []
-            for result in platform_prices:
-                if isinstance(result, PlatformPrice):
-                    valid_prices.append(result)
-                elif isinstance(result, Exception):
-                    logger.warning(f"Price fetch failed: {result}")
+            missing_platforms: List[str] = []
+            pending = set(price_tasks)
+            while pending:
+                timeout = None
+                if deadline_at is not None:
+                    timeout = max(0.0, deadline_at - asyncio.get_running_loop().time())
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    break
+                for task in done:
+                    try:
+                        price = task.result()
+                    except Exception as e:
+                        logger.warning(f"Price fetch failed for {price_tasks[task]}: {e}")
+                        missing_platforms.append(price_tasks[task])
+                        continue
+                    valid_prices.append(price)
+                    yield price
+            
+            timed_out = [price_tasks[task] for task in pending]
+            if timed_out:
+                logger.warning(f"⏱️ Price comparison deadline passed; missing: {', '.join(timed_out)}")
+                missing_platforms.extend(timed_out)
             
             if not valid_prices:
                 raise ValueError("No valid prices found")
@@ -168,43 +454,287 @@ class PriceComparisonService:
             result = self._calculate_comparison_result(
                 product_name, valid_prices, start_time
             )
+            result.missing_platforms = missing_platforms
             
-            # Cache the result
-            self.cache[cache_key] = (result, datetime.now())
+            # Cache the result; results assembled from stale prices or cut short by the deadline are not cached
+            if not result.stale and not timed_out:
+                self.cache.set(cache_key, (result, datetime.now()))
             
             logger.info(f"💰 Price comparison complete: {len(valid_prices)} platforms compared")
-            return result
+            yield result
             
         except Exception as e:
             logger.error(f"❌ Price comparison failed: {e}")
             raise
+        finally:
+            for task in price_tasks:
+                task.cancel()
+    
+    async def fetch_product_details(self, url: str) -> Dict[str, Any]:
+        """
+        Product details for a product URL on a supported retailer
+        
+        Reads the page until its structured data (JSON-LD, microdata or
+        OpenGraph) settles the price, falling back to selectors and regex
+        scanning. Only configured retailer hosts are fetched (redirects
+        included), so the endpoint cannot be used to reach internal addresses.
+        """
+        platform = self._identify_platform(url)
+        if platform is None:
+            raise ValueError(f"Unsupported product URL: {url}")
+        config = self.platform_configs[platform]
+        retailer = config["name"]
+        
+        lane = self._parse_lane()
+        extractor = await lane.create(PageExtractor, platform, config.get("selectors"))
+        try:
+            async with self.fetch_limiter.slot(platform):
+                async with self.http_client.get(
+                    url, decompress=False, allowed_host=self._is_retailer_host
+                ) as response:
+                    if response.status != 200:
+                        raise HTTPStatusError(response.status)
+                    read = await read_page(
+                        response, extractor, self.max_page_bytes, self.max_compression_ratio, lane=lane
+                    )
+            self._record_page_read(read)
+            
+            info = await lane.call(extractor, "result")
+        finally:
+            lane.release(extractor)
+        return {
+            "url": url,
+            "name": info["name"],
+            "price": info["base_price"],
+            "currency": info["currency"] or config["currency"],
+            "retailer": retailer,
+            "category": info["category"],
+            "description": info["description"],
+            "brand": info["brand"],
+            "gtin": info["gtin"],
+            "availability": info["availability"],
+            "source": info["source"],
+            "confidence": info["confidence"] if info["base_price"] > 0 else 0.0,
+        }
     
     def _identify_platform(self, url: str) -> Optional[str]:
-        """Identify platform from URL"""
-        parsed_url = urlparse(url)
-        domain = parsed_url.netloc.lower()
+        """
+        Identify platform from URL
         
+        Only http(s) URLs on a configured retailer host (or one of its
+        subdomains) match; URLs with credentials or backslashes are rejected
+        because parsers disagree on which host they name.
+        """
+        if "\\" in url:
+            return None
+        parsed_url = urlparse(url)
+        if parsed_url.scheme not in ("http", "https") or parsed_url.username is not None:
+            return None
+        return self._platform_for_host(parsed_url.hostname or "")
+    
+    def _is_retailer_host(self, host: str) -> bool:
+        return self._platform_for_host(host) is not None
+    
+    def _platform_for_host(self, host: str) -> Optional[str]:
+        """Platform whose configured hostname is `host` or a parent domain of it"""
+        host = host.lower().rstrip(".")
         for platform_key in self.platform_configs.keys():
-            if platform_key in domain:
+            if host == platform_key or host.endswith("." + platform_key):
                 return platform_key
-                
         return None
     
+    def _canonical_url(self, url: str) -> str:
+        """Normalize a product URL so equivalent links share fetches and cache entries"""
+        parsed = urlparse(url.strip())
+        query = sorted(
+            (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+            if key not in TRACKING_PARAMS and not key.startswith("utm_")
+        )
+        return urlunparse((
+            parsed.scheme.lower() or "https",
+            parsed.netloc.lower(),
+            parsed.path.rstrip('/') or '/',
+            '',
+            urlencode(query),
+            ''
+        ))
+    
+    def _fetch_key(
+        self,
+        url: str,
+        platform: str,
+        user_location: Optional[Dict[str, str]]
+    ) -> str:
+        """Key identifying one platform fetch: canonical URL plus location"""
+        location = json.dumps(user_location or {}, sort_keys=True)
+        return f"{self._product_key(url, platform)}|{location}"
+    
+    def _product_key(self, url: str, platform: str) -> str:
+        """Key identifying one product listing regardless of user location"""
+        return f"{platform}|{self._canonical_url(url)}"
+    
     async def _fetch_platform_price(
         self, 
         url: str, 
         platform: str,
         user_location: Optional[Dict[str, str]]
     ) -> PlatformPrice:
-        """Fetch price from a specific platform"""
+        """
+        Fetch price from a specific platform.
+        
+        Fresh per-platform cache entries are served directly; misses share one
+        in-flight fetch per (platform, canonical URL, location). With
+        stale-while-revalidate, entries past their TTL but within `max_staleness`
+        are served marked stale while a background task refreshes them.
+        """
+        key = self._fetch_key(url, platform, user_location)
+        self.refresh_scheduler.record_access(
+            key, self._product_key(url, platform), url, platform, user_location
+        )
+        
+        cached: Optional[CachedPrice] = await self.price_store.get(key)
+        if cached is not None:
+            age = datetime.now() - cached.fetched_at
+            if age < cached.ttl:
+                return cached.price
+            if self.stale_while_revalidate and age < cached.ttl + self.max_staleness:
+                self._refresh_in_background(key, url, platform, user_location)
+                return replace(cached.price, stale=True)
+            # Too old to serve; kept until the refetch replaces it so its validators can be reused
+        
+        return await self._coalesced_fetch(key, url, platform, user_location)
+    
+    def _coalesced_fetch(
+        self,
+        key: str,
+        url: str,
+        platform: str,
+        user_location: Optional[Dict[str, str]]
+    ) -> Any:
+        """Fetch and cache through the single-flight layers"""
+        return coalesce(
+            self.single_flight,
+            self.redis_single_flight,
+            key,
+            lambda: self._fetch_and_cache_platform_price(key, url, platform, user_location)
+        )
+    
+    def _refresh_target(self, target: RefreshTarget) -> Any:
+        """Scheduler callback: refresh one tracked platform price"""
+        return self._coalesced_fetch(target.key, target.url, target.platform, target.user_location)
+    
+    def _refresh_in_background(
+        self,
+        key: str,
+        url: str,
+        platform: str,
+        user_location: Optional[Dict[str, str]]
+    ) -> None:
+        """Start a background refresh; concurrent refreshes of one key coalesce"""
+        task = asyncio.create_task(self._coalesced_fetch(key, url, platform, user_location))
+        self._background_tasks.add(task)
+        
+        def on_done(finished: "asyncio.Task[Any]") -> None:
+            self._background_tasks.discard(finished)
+            if not finished.cancelled() and finished.exception() is not None:
+                logger.warning(f"Background refresh failed for {platform}: {finished.exception()}")
+        
+        task.add_done_callback(on_done)
+    
+    async def _fetch_and_cache_platform_price(
+        self,
+        key: str,
+        url: str,
+        platform: str,
+        user_location: Optional[Dict[str, str]]
+    ) -> PlatformPrice:
+        """
+        Fetch a platform price and store it with a TTL adapted to its volatility
+        
+        URLs that failed within `negative_cache_ttl` and platforms whose
+        circuit breaker is open fail immediately without a request.
+        """
+        recent_error = self.failed_urls.get(key)
+        if recent_error is not None:
+            raise RecentlyFailedError(f"{platform} fetch failed recently: {recent_error}")
+        breaker = self.circuit_breakers.get(platform)
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {platform}")
+        
+        previous: Optional[CachedPrice] = await self.price_store.get(key)
+        try:
+            price, validators = await self._fetch_platform_price_direct(
+                url, platform, user_location, previous.validators if previous else None
+            )
+        except Exception as e:
+            if is_platform_failure(e):
+                breaker.record_failure()
+            else:
+                breaker.record_success()  # The retailer answered; only this page is bad
+            self.failed_urls.set(key, str(e) or type(e).__name__)
+            raise
+        except BaseException:
+            breaker.record_cancelled()
+            raise
+        breaker.record_success()
+        # A concurrent fetch of this URL may have failed while this one was in flight
+        self.failed_urls.discard(key)
+
+        product_key = self._product_key(url, platform)
+        if price is None:
+            # 304 Not Modified: the cached price is confirmed fresh without re-parsing
+            assert previous is not None
+            price = replace(previous.price, last_updated=datetime.now(), stale=False)
+            self.volatility.confirm_unchanged(product_key)
+        else:
+            self.volatility.observe(product_key, price.base_price)
+        ttl = self.volatility.ttl_for(
+            product_key,
+            default=timedelta(
+                seconds=self.platform_configs[platform].get("cache_ttl", self.cache_duration.total_seconds())
+            )
+        )
+        # The shared tier keeps entries long enough to be served stale
+        retention = ttl + self.max_staleness if self.stale_while_revalidate else ttl
+        fetched_at = datetime.now()
+        await self.price_store.set(
+            key,
+            CachedPrice(price=price, fetched_at=fetched_at, ttl=ttl, validators=validators),
+            retention.total_seconds()
+        )
+        self.refresh_scheduler.record_expiry(key, (fetched_at + ttl).timestamp())
+        return price
+    
+    async def _fetch_platform_price_direct(
+        self, 
+        url: str, 
+        platform: str,
+        user_location: Optional[Dict[str, str]],
+        validators: Optional[Dict[str, str]] = None
+    ) -> Tuple[Optional[PlatformPrice], Dict[str, str]]:
+        """
+        Fetch price from a specific platform
+        
+        Returns the price (None when a conditional request found the page
+        unchanged) and the response validators to store with it. Scrapes are
+        hedged when slow and retried with backoff on transient errors.
+        """
         config = self.platform_configs[platform]
         
+        def scrape() -> Any:
+            return self._fetch_via_scraping(url, platform, config, user_location, validators)
+        
+        def attempt() -> Any:
+            if self.hedging is not None:
+                return self.hedging.run(platform, scrape)
+            return scrape()
+        
         try:
             # Use API if available, otherwise scrape
             if config.get("api_endpoint"):
-                return await self._fetch_via_api(url, platform, config, user_location)
+                return await self._fetch_via_api(url, platform, config, user_location), {}
             else:
-                return await self._fetch_via_scraping(url, platform, config, user_location)
+                return await self.retry_policy.run(platform, attempt)
                 
         except Exception as e:
             logger.error(f"❌ Failed to fetch price from {platform}: {e}")
@@ -241,120 +771,102 @@ class PriceComparisonService:
         url: str, 
         platform: str, 
         config: Dict[str, Any],
-        user_location: Optional[Dict[str, str]]
-    ) -> PlatformPrice:
-        """Fetch price via web scraping"""
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
+        user_location: Optional[Dict[str, str]],
+        validators: Optional[Dict[str, str]] = None
+    ) -> Tuple[Optional[PlatformPrice], Dict[str, str]]:
+        """Fetch price via web scraping, revalidating with stored ETag / Last-Modified"""
+        
+        request_headers = {
+            CONDITIONAL_HEADERS[name]: value
+            for name, value in (validators or {}).items()
+            if name in CONDITIONAL_HEADERS
         }
         
-        async with aiohttp.ClientSession(headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as session:
-            try:
-                async with session.get(url) as response:
+        try:
+            async with self.fetch_limiter.slot(platform):
+                if request_headers:
+                    self._conditional_stats["conditional_requests"] += 1
+                async with self.http_client.get(
+                    url,
+                    headers=request_headers or None,
+                    decompress=False,
+                    allowed_host=self._is_retailer_host
+                ) as response:
+                    if response.status == 304 and request_headers:
+                        self._conditional_stats["not_modified"] += 1
+                        # A 304 may carry updated validators; keep the old ones otherwise
+                        return None, {**(validators or {}), **self._response_validators(response)}
                     if response.status != 200:
-                        raise Exception(f"HTTP {response.status}")
-                    
-                    html_content = await response.text()
-                    
-                    # Extract price information
-                    price_info = self._extract_price_info(html_content, config, platform)
+                        raise HTTPStatusError(response.status)
                     
-                    # Calculate shipping and taxes
-                    shipping_cost = self._calculate_shipping(
-                        price_info["base_price"], platform, user_location
-                    )
-                    tax_amount = self._calculate_tax(
-                        price_info["base_price"], platform, user_location
-                    )
+                    response_validators = self._response_validators(response)
                     
-                    return PlatformPrice(
-                        platform=config["name"],
-                        base_price=price_info["base_price"],
-                        shipping_cost=shipping_cost,
-                        tax_amount=tax_amount,
-                        total_price=price_info["base_price"] + shipping_cost + tax_amount,
-                        currency=config["currency"],
-                        availability=price_info["availability"],
-                        delivery_time=price_info["delivery_time"],
-                        url=url,
-                        last_updated=datetime.now(),
-                        deals=price_info["deals"],
-                        confidence=price_info["confidence"]
-                    )
-                    
-            except Exception as e:
-                logger.error(f"❌ Scraping failed for {platform}: {e}")
-                raise
+                    # Stream the page into the extractor; stops once price and availability are known
+                    lane = self._parse_lane()
+                    extractor = await lane.create(PageExtractor, platform, config.get("selectors"))
+                    try:
+                        read = await read_page(
+                            response, extractor, self.max_page_bytes, self.max_compression_ratio, lane=lane
+                        )
+                    except BaseException:
+                        lane.release(extractor)
+                        raise
+                
+            self._record_page_read(read)
+            
+            # Extract price information (selector evaluation runs on the page's parse worker)
+            try:
+                price_info = await lane.call(extractor, "result")
+            finally:
+                lane.release(extractor)
+            
+            # Calculate shipping and taxes; shipping shown on the page wins when found
+            shipping_cost = price_info.get("shipping_cost")
+            if shipping_cost is None:
+                shipping_cost = self._calculate_shipping(
+                    price_info["base_price"], platform, user_location
+                )
+            tax_amount = self._calculate_tax(
+                price_info["base_price"], platform, user_location
+            )
+            
+            return PlatformPrice(
+                platform=config["name"],
+                base_price=price_info["base_price"],
+                shipping_cost=shipping_cost,
+                tax_amount=tax_amount,
+                total_price=price_info["base_price"] + shipping_cost + tax_amount,
+                currency=config["currency"],
+                availability=price_info["availability"],
+                delivery_time=price_info["delivery_time"],
+                url=url,
+                last_updated=datetime.now(),
+                deals=price_info["deals"],
+                confidence=price_info["confidence"]
+            ), response_validators
+            
+        except Exception as e:
+            logger.error(f"❌ Scraping failed for {platform}: {e}")
+            raise
     
-    def _extract_price_info(
-        self, 
-        html_content: str, 
-        config: Dict[str, Any], 
-        platform: str
-    ) -> Dict[str, Any]:
-        """Extract price information from HTML content"""
-        
-        # This is a simplified implementation
-        # In production, you'd use proper HTML parsing with BeautifulSoup or similar
-        
-        # Extract price using regex patterns
-        price_patterns = [
-            r'₹\s*([0-9,]+\.?[0-9]*)',
-            r'\$\s*([0-9,]+\.?[0-9]*)',
-            r'price["\']:\s*["\']?([0-9,]+\.?[0-9]*)',
-            r'amount["\']:\s*["\']?([0-9,]+\.?[0-9]*)'
-        ]
-        
-        base_price = 0.0
-        for pattern in price_patterns:
-            matches = re.findall(pattern, html_content, re.IGNORECASE)
-            if matches:
-                try:
-                    price_str = matches[0].replace(',', '')
-                    base_price = float(price_str)
-                    break
-                except ValueError:
-                    continue
-        
-        # Check availability
-        availability = True
-        out_of_stock_patterns = [
-            r'out of stock',
-            r'currently unavailable',
-            r'sold out',
-            r'not available'
-        ]
-        
-        for pattern in out_of_stock_patterns:
-            if re.search(pattern, html_content, re.IGNORECASE):
-                availability = False
-                break
-        
-        # Extract delivery time
-        delivery_time = "3-5 days"  # Default
-        delivery_patterns = [
-            r'delivery in (\d+-?\d* days?)',
-            r'ships in (\d+-?\d* days?)',
-            r'arrives (\w+ \d+)'
-        ]
-        
-        for pattern in delivery_patterns:
-            matches = re.findall(pattern, html_content, re.IGNORECASE)
-            if matches:
-                delivery_time = matches[0]
-                break
-        
+    def _parse_lane(self) -> Any:
+        """Where one page is decoded and parsed: a parse worker, or the loop"""
+        return self.parse_executor.lane() if self.parse_executor is not None else InlineLane()
+    
+    def _record_page_read(self, read: PageReadResult) -> None:
+        self._page_stats["pages"] += 1
+        self._page_stats["wire_bytes"] += read.wire_bytes
+        self._page_stats["decoded_bytes"] += read.decoded_bytes
+        self._page_stats["early_exits"] += int(read.early_exit)
+        self._page_stats["truncated"] += int(read.truncated)
+    
+    @staticmethod
+    def _response_validators(response: Any) -> Dict[str, str]:
+        """ETag / Last-Modified headers worth sending back on the next refetch"""
         return {
-            "base_price": base_price,
-            "availability": availability,
-            "delivery_time": delivery_time,
-            "deals": [],  # Would extract deals/offers
-            "confidence": 0.8 if base_price > 0 else 0.3
+            name: response.headers[name]
+            for name in CONDITIONAL_HEADERS
+            if response.headers.get(name)
         }
     
     def _calculate_shipping(
@@ -429,6 +941,10 @@ class PriceComparisonService:
         # Generate product ID
         product_id = hashlib.md5(product_name.encode()).hexdigest()[:8]
         
+        # Report the age of the oldest price used
+        now = datetime.now()
+        age_seconds = max((now - p.last_updated).total_seconds() for p in platform_prices)
+        
         return PriceComparisonResult(
             product_name=product_name,
             product_id=product_id,
@@ -437,13 +953,21 @@ class PriceComparisonService:
             total_savings=total_savings,
             average_price=average_price,
             price_range=price_range,
-            last_updated=datetime.now(),
-            processing_time=(datetime.now() - start_time).total_seconds()
+            last_updated=now,
+            processing_time=(datetime.now() - start_time).total_seconds(),
+            stale=any(p.stale for p in platform_prices),
+            age_seconds=max(age_seconds, 0.0)
         )
     
-    def _generate_cache_key(self, product_name: str, urls: List[str]) -> str:
+    def _generate_cache_key(
+        self,
+        product_name: str,
+        urls: List[str],
+        user_location: Optional[Dict[str, str]] = None
+    ) -> str:
         """Generate cache key for price comparison"""
-        key_data = f"{product_name}:{':'.join(sorted(urls))}"
+        location = json.dumps(user_location or {}, sort_keys=True)
+        key_data = f"{product_name}:{':'.join(sorted(urls))}:{location}"
         return hashlib.md5(key_data.encode()).hexdigest()
     
     async def get_price_history(
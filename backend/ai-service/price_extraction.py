@@ -0,0 +1,193 @@
+"""
+Price Extraction - Incremental price, availability and delivery scanning
+
+`PriceScanner` consumes page text chunk by chunk and keeps only a short
+overlap between chunks, so a page is read once and never has to be held in
+memory as a whole. Each chunk is lower-cased once and searched with patterns
+compiled at import time; signals drop out as soon as they are resolved. The
+scanner reports itself done once the preferred price pattern and an
+availability signal have been seen (plus a short window to pick up the
+delivery estimate that usually sits next to them), which lets the reader stop
+downloading. An in-stock signal alone is not trusted to stop early: the scan
+runs the full window in case out-of-stock text follows.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# (kind, regex) in order of preference within each kind: the first price
+# pattern with a match wins, and so on. Patterns are written in lower case and
+# start with a literal so the regex engine can skip ahead to candidates; context
+# before a match is checked in Python (see `_NEGATIONS`).
+SIGNALS: List[Tuple[str, str]] = [
+    ("price", r'₹\s*([0-9,]+\.?[0-9]*)'),
+    ("price", r'\$\s*([0-9,]+\.?[0-9]*)'),
+    ("price", r'price["\']:\s*["\']?([0-9,]+\.?[0-9]*)'),
+    ("price", r'amount["\']:\s*["\']?([0-9,]+\.?[0-9]*)'),
+    ("out_of_stock", r'out of stock'),
+    ("out_of_stock", r'currently unavailable'),
+    ("out_of_stock", r'sold out'),
+    ("out_of_stock", r'not available'),
+    # Buy-box signals; they also show up in "notify me when back in stock" widgets
+    # and recommendation carousels, so they never end the scan on their own
+    ("in_stock", r'in stock\b'),
+    ("in_stock", r'add to cart\b'),
+    ("in_stock", r'buy now\b'),
+    ("delivery", r'delivery in (\d+-?\d* days?)'),
+    ("delivery", r'ships in (\d+-?\d* days?)'),
+    ("delivery", r'arrives (\w+ \d+)'),
+]
+
+_PATTERNS = [(kind, re.compile(pattern)) for kind, pattern in SIGNALS]
+# Used for the rare text whose lower-casing changes its length
+_CASELESS_PATTERNS = [(kind, re.compile(pattern, re.IGNORECASE)) for kind, pattern in SIGNALS]
+
+# Words that turn an in-stock phrase into its opposite ("back in stock", "not in stock")
+_NEGATIONS = ("back ", "not ", "longer ")
+# Text kept ahead of each chunk so a match's preceding word can be checked
+_CONTEXT = max(len(word) for word in _NEGATIONS) + 1
+
+DEFAULT_DELIVERY_TIME = "3-5 days"
+
+
+def _parse_price(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value.replace(',', ''))
+    except ValueError:
+        return None
+
+
+def _is_standalone_signal(kind: str, haystack: str, start: int) -> bool:
+    """Whether a match starts a word and, for in-stock phrases, is not negated"""
+    if kind != "in_stock":
+        return True
+    if start and haystack[start - 1].isalnum():
+        return False
+    before = haystack[max(0, start - _CONTEXT):start].lower()
+    return not before.endswith(_NEGATIONS)
+
+
+class PriceScanner:
+    """
+    Streaming extractor fed by `page_reader.read_page`
+
+    Matches that end inside the last `overlap` characters of a chunk are
+    deferred to the next chunk, so values split across chunk boundaries are
+    never read half-way.
+    """
+
+    def __init__(self, overlap: int = 256, delivery_window: int = 16 * 1024):
+        self.overlap = overlap
+        self.delivery_window = delivery_window
+        self.done = False
+        self._buffer = ""
+        self._context = 0  # Leading buffer characters already scanned, kept as context
+        self._consumed = 0  # Characters fed so far
+        self._settled_at: Optional[int] = None  # Where price and availability became known
+        self._found: List[Optional[str]] = [None] * len(SIGNALS)  # First match per signal
+
+    def _resolved_by_earlier(self, index: int) -> bool:
+        """True when a preferred signal of the same kind already decided the value"""
+        kind = SIGNALS[index][0]
+        for earlier in range(index):
+            if SIGNALS[earlier][0] != kind or self._found[earlier] is None:
+                continue
+            if kind != "price" or _parse_price(self._found[earlier]) is not None:
+                return True
+        return False
+
+    def _has(self, kind: str) -> bool:
+        return any(
+            value is not None and signal_kind == kind
+            for (signal_kind, _), value in zip(SIGNALS, self._found)
+        )
+
+    def _price(self) -> Tuple[bool, float]:
+        """Whether the price is settled (no later text can change it), and its value"""
+        settled = True
+        for (kind, _), value in zip(SIGNALS, self._found):
+            if kind != "price":
+                continue
+            if value is None:
+                # A preferred pattern may still match further down the page
+                settled = False
+                continue
+            parsed = _parse_price(value)
+            if parsed is not None:
+                return settled, parsed
+        return settled, 0.0
+
+    def feed(self, text: str, final: bool = False) -> bool:
+        """Scan the next chunk of page text; returns True once extraction is complete"""
+        if self.done:
+            return True
+
+        buffer = self._buffer + text
+        self._consumed += len(text)
+        safe_end = len(buffer) if final else max(0, len(buffer) - self.overlap)
+        resume_from = safe_end
+
+        haystack = buffer.lower()
+        patterns = _PATTERNS
+        if len(haystack) != len(buffer):
+            haystack, patterns = buffer, _CASELESS_PATTERNS
+
+        for index, (kind, pattern) in enumerate(patterns):
+            if self._found[index] is not None or self._resolved_by_earlier(index):
+                continue
+            match = pattern.search(haystack, self._context)
+            while match is not None and not _is_standalone_signal(kind, haystack, match.start()):
+                match = pattern.search(haystack, match.start() + 1)
+            if match is None:
+                continue
+            if match.end() > safe_end:
+                resume_from = min(resume_from, match.start())
+                continue
+            # Values come from the original text so their case is preserved
+            self._found[index] = buffer[match.start(1):match.end(1)] if pattern.groups else ""
+
+        keep_from = max(0, resume_from - _CONTEXT)
+        self._buffer = buffer[keep_from:]
+        self._context = resume_from - keep_from
+        if self._settled_at is None and self._price()[0] and (
+            self._has("out_of_stock") or self._has("in_stock")
+        ):
+            self._settled_at = self._consumed
+        self.done = final or (
+            self._settled_at is not None and (
+                (self._has("out_of_stock") and self._has("delivery"))
+                or self._consumed - self._settled_at >= self.delivery_window
+            )
+        )
+        return self.done
+
+    def result(self) -> Dict[str, Any]:
+        """Extracted fields in the shape PriceComparisonService expects"""
+        _, base_price = self._price()
+        delivery_time = next(
+            (
+                value for (kind, _), value in zip(SIGNALS, self._found)
+                if kind == "delivery" and value is not None
+            ),
+            DEFAULT_DELIVERY_TIME
+        )
+
+        return {
+            "base_price": base_price,
+            "availability": not self._has("out_of_stock"),
+            "delivery_time": delivery_time,
+            "deals": [],  # Would extract deals/offers
+            "confidence": 0.8 if base_price > 0 else 0.3
+        }
+
+
+def extract_price_info(html_content: str) -> Dict[str, Any]:
+    """Extract price information from a complete HTML document"""
+    scanner = PriceScanner()
+    scanner.feed(html_content, final=True)
+    return scanner.result()
+
+
+__all__ = ["PriceScanner", "extract_price_info"]
@@ -0,0 +1,147 @@
+"""
+Fetch Rate Limiting - Per-retailer concurrency and request-rate limits
+
+Each platform gets a concurrency semaphore and a token bucket, and a global
+semaphore caps total in-flight fetches. Waiters queue in FIFO order instead of
+failing, so bursts are smoothed rather than rejected.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Any, Optional
+
+
+class TokenBucket:
+    """Token bucket with FIFO waiters"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_acquire(self) -> bool:
+        """Take one token if available without waiting"""
+        self._refill()
+        if self.tokens < 1 or self._lock.locked():
+            return False
+        self.tokens -= 1
+        return True
+
+    async def acquire(self) -> None:
+        """Wait for and take one token; the lock keeps waiters in arrival order"""
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class RatioBudget:
+    """
+    Caps extra work (hedges, retries) at a fraction of regular requests
+
+    Each request deposits `ratio` tokens, up to `burst`; each extra attempt
+    spends one. Over any stretch of traffic extra attempts stay within
+    `ratio` of requests, plus the burst.
+    """
+
+    def __init__(self, ratio: float, burst: float = 10.0):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = burst
+        self._stats: Dict[str, int] = {"requests": 0, "spent": 0, "denied": 0}
+
+    def deposit(self) -> None:
+        """Record one regular request"""
+        self._stats["requests"] += 1
+        self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Take one token for an extra attempt if the budget allows it"""
+        if self.tokens < 1:
+            self._stats["denied"] += 1
+            return False
+        self.tokens -= 1
+        self._stats["spent"] += 1
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"ratio": self.ratio, "tokens": self.tokens, **self._stats}
+
+
+class FetchLimiter:
+    """
+    Per-platform concurrency and rate limits plus a global in-flight cap
+    """
+
+    def __init__(
+        self,
+        platform_configs: Dict[str, Dict[str, Any]],
+        max_in_flight: int = 50
+    ):
+        self.max_in_flight = max_in_flight
+        self._global = asyncio.Semaphore(max_in_flight)
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+        for platform, config in platform_configs.items():
+            self._semaphores[platform] = asyncio.Semaphore(config.get("concurrency", 4))
+            rate_limit = config.get("rate_limit")
+            if rate_limit:
+                self._buckets[platform] = TokenBucket(rate_limit["rate"], rate_limit["burst"])
+            self._stats[platform] = {
+                "in_flight": 0,
+                "queued": 0,
+                "acquired": 0,
+                "wait_seconds_total": 0.0,
+                "wait_seconds_max": 0.0,
+            }
+
+    @asynccontextmanager
+    async def slot(self, platform: str) -> AsyncIterator[None]:
+        """Hold a fetch slot for `platform`, queueing until one is free"""
+        stats = self._stats[platform]
+        bucket: Optional[TokenBucket] = self._buckets.get(platform)
+        queued_at = time.monotonic()
+        stats["queued"] += 1
+
+        # Platform slot first, so one slow retailer cannot hold global slots while it waits
+        async with self._semaphores[platform]:
+            try:
+                if bucket:
+                    await bucket.acquire()
+                await self._global.acquire()
+            finally:
+                stats["queued"] -= 1
+
+            waited = time.monotonic() - queued_at
+            stats["acquired"] += 1
+            stats["wait_seconds_total"] += waited
+            stats["wait_seconds_max"] = max(stats["wait_seconds_max"], waited)
+            stats["in_flight"] += 1
+            try:
+                yield
+            finally:
+                stats["in_flight"] -= 1
+                self._global.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, in-flight counts and wait times per platform"""
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": sum(stats["in_flight"] for stats in self._stats.values()),
+            "platforms": {platform: dict(stats) for platform, stats in self._stats.items()},
+        }
+
+
+__all__ = ["FetchLimiter", "TokenBucket", "RatioBudget"]
@@ -0,0 +1,38 @@
+"""
+Redis Store - Redis client factory and shared Redis scripts
+
+The AI service talks to Redis through a small subset of `redis.asyncio`:
+GET/SET/DELETE/EXISTS, pub/sub and the lock release script below. The tests
+run the cross-worker features against an in-process fake of that subset.
+"""
+
+import logging
+from typing import Any, Optional
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Delete a lock only while it still holds our token, atomically; KEYS[1] is
+# the lock, ARGV[1] the token
+RELEASE_LOCK_SCRIPT = (
+    "if redis.call('get', KEYS[1]) == ARGV[1] then "
+    "return redis.call('del', KEYS[1]) "
+    "end "
+    "return 0"
+)
+
+
+def create_redis_client(redis_url: str) -> Optional[Any]:
+    """Create an asyncio Redis client, or None when the redis package is missing"""
+    if not REDIS_AVAILABLE:
+        logger.warning("⚠️ redis package not installed; cross-worker features disabled")
+        return None
+    return aioredis.from_url(redis_url)
+
+
+__all__ = ["create_redis_client", "RELEASE_LOCK_SCRIPT", "REDIS_AVAILABLE"]
@@ -0,0 +1,211 @@
+"""
+Refresh Scheduler - Keeps hot product prices warm before they expire
+
+Accesses and cache expiries are tracked per platform fetch. Every cycle the
+scheduler builds a priority queue of entries that are about to expire (or have
+expired), ordered by popularity x volatility x urgency, and refreshes as many
+as the fetch budget allows. Refreshes go through the normal fetch path, so
+per-retailer rate limits and single-flight coalescing still apply. A failed
+refresh is retried in a later cycle after an exponentially growing delay.
+"""
+
+import asyncio
+import heapq
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RefreshTarget:
+    key: str
+    product_key: str
+    url: str
+    platform: str
+    user_location: Optional[Dict[str, str]]
+    popularity: float = 0.0  # Exponentially decayed access count
+    popularity_updated: float = field(default_factory=time.time)
+    expires_at: Optional[float] = None
+    failures: int = 0  # Consecutive failed refreshes
+    retry_at: Optional[float] = None  # No refresh before this time after a failure
+
+
+class RefreshScheduler:
+    """
+    Budgeted background refresher for popular, volatile, soon-to-expire prices
+    """
+
+    def __init__(
+        self,
+        refresh: Callable[[RefreshTarget], Awaitable[Any]],
+        change_rate: Callable[[str], Optional[float]],
+        budget_per_minute: int = 60,
+        interval: float = 5.0,
+        lookahead: float = 30.0,
+        concurrency: int = 4,
+        min_popularity: float = 2.0,
+        popularity_half_life: float = 3600.0,
+        max_tracked: int = 50_000,
+        retry_base_delay: float = 10.0,
+        retry_max_delay: float = 600.0
+    ):
+        self.refresh = refresh
+        self.change_rate = change_rate
+        self.interval = interval
+        self.lookahead = lookahead
+        self.concurrency = concurrency
+        self.min_popularity = min_popularity
+        self.popularity_half_life = popularity_half_life
+        self.max_tracked = max_tracked
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.budget = TokenBucket(rate=budget_per_minute / 60.0, burst=max(1, budget_per_minute))
+
+        self._targets: "OrderedDict[str, RefreshTarget]" = OrderedDict()
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._stats: Dict[str, float] = {
+            "queue_depth": 0,
+            "cycles": 0,
+            "refreshes": 0,
+            "refresh_failures": 0,
+            "budget_exhausted": 0,
+        }
+
+    def _decayed_popularity(self, target: RefreshTarget, now: float) -> float:
+        elapsed = max(0.0, now - target.popularity_updated)
+        return target.popularity * 0.5 ** (elapsed / self.popularity_half_life)
+
+    def record_access(
+        self,
+        key: str,
+        product_key: str,
+        url: str,
+        platform: str,
+        user_location: Optional[Dict[str, str]]
+    ) -> None:
+        """Count a user request for a platform price"""
+        now = time.time()
+        target = self._targets.get(key)
+        if target is None:
+            target = RefreshTarget(key, product_key, url, platform, user_location)
+            self._targets[key] = target
+            if len(self._targets) > self.max_tracked:
+                self._targets.popitem(last=False)
+        else:
+            self._targets.move_to_end(key)
+
+        target.popularity = self._decayed_popularity(target, now) + 1.0
+        target.popularity_updated = now
+
+    def record_expiry(self, key: str, expires_at: float) -> None:
+        """Note when a tracked entry's cached price expires"""
+        target = self._targets.get(key)
+        if target is not None:
+            target.expires_at = expires_at
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _build_queue(self, now: float) -> List[Tuple[float, str]]:
+        """Priority queue (max-heap via negated scores) of entries worth refreshing"""
+        queue: List[Tuple[float, str]] = []
+        for key, target in self._targets.items():
+            if target.expires_at is None:
+                continue
+            if target.retry_at is not None and now < target.retry_at:
+                continue
+            time_to_expiry = target.expires_at - now
+            if time_to_expiry > self.lookahead:
+                continue
+            popularity = self._decayed_popularity(target, now)
+            if popularity < self.min_popularity:
+                continue
+
+            # Changes per hour; stable products still get a baseline weight of 1
+            volatility = 1.0 + (self.change_rate(target.product_key) or 0.0) * 3600
+            urgency = 1.0 / (max(time_to_expiry, 0.0) + 1.0)
+            queue.append((-(popularity * volatility * urgency), key))
+
+        heapq.heapify(queue)
+        return queue
+
+    async def run_cycle(self) -> int:
+        """Refresh the highest-priority entries the budget allows; returns refreshes started"""
+        queue = self._build_queue(time.time())
+        self._stats["queue_depth"] = len(queue)
+        self._stats["cycles"] += 1
+
+        started = 0
+        while queue:
+            batch: List[RefreshTarget] = []
+            expiries: List[Optional[float]] = []
+            while queue and len(batch) < self.concurrency:
+                if not self.budget.try_acquire():
+                    self._stats["budget_exhausted"] += 1
+                    break
+                _, key = heapq.heappop(queue)
+                target = self._targets.get(key)
+                if target is None:
+                    continue
+                expiries.append(target.expires_at)
+                target.expires_at = None  # Re-recorded when the refreshed price is stored
+                batch.append(target)
+            if not batch:
+                break
+
+            results = await asyncio.gather(*(self.refresh(t) for t in batch), return_exceptions=True)
+            for target, expires_at, result in zip(batch, expiries, results):
+                if isinstance(result, BaseException):
+                    self._stats["refresh_failures"] += 1
+                    delay = self._retry_delay(target)
+                    logger.warning(
+                        f"Scheduled refresh failed for {target.platform}, retrying in {delay:.1f}s: {result}"
+                    )
+                    # The cached price is still expiring, so keep the entry queued
+                    if target.expires_at is None:
+                        target.expires_at = expires_at
+                else:
+                    self._stats["refreshes"] += 1
+                    target.failures = 0
+                    target.retry_at = None
+            started += len(batch)
+            self._stats["queue_depth"] = len(queue)
+
+        return started
+
+    def _retry_delay(self, target: RefreshTarget) -> float:
+        """Back off exponentially per consecutive failure, up to `retry_max_delay`"""
+        target.failures += 1
+        delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** (target.failures - 1))
+        target.retry_at = time.time() + delay
+        return delay
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_cycle()
+            except Exception as e:
+                logger.error(f"❌ Refresh cycle failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "tracked": len(self._targets)}
+
+
+__all__ = ["RefreshScheduler", "RefreshTarget"]
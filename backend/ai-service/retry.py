@@ -0,0 +1,104 @@
+"""
+Fetch Retries - Exponential backoff with full jitter under a retry budget
+
+Retailer fetches are idempotent GETs, so a fetch that fails with a transient
+error (timeout, dropped connection, 408/429/5xx) is retried after a random
+delay drawn from an exponentially growing window. A process-wide
+`RatioBudget` caps retries at a fraction of fetches: during a retailer outage
+retries stop once the budget is spent instead of multiplying the load.
+"""
+
+import asyncio
+import logging
+import random
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+from http_client import HTTPStatusError, is_transport_error
+from rate_limit import RatioBudget
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Transient errors worth another attempt; page and parsing errors are not"""
+    if isinstance(error, HTTPStatusError):
+        return error.status in RETRYABLE_STATUSES
+    return is_transport_error(error)
+
+
+class RetryPolicy:
+    """
+    Retries for idempotent fetches, shared by every platform in the process
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.2,
+        max_delay: float = 2.0,
+        budget_ratio: float = 0.1,
+        budget_burst: float = 10.0
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = RatioBudget(budget_ratio, budget_burst)
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _platform_stats(self, name: str) -> Dict[str, int]:
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = {
+                "fetches": 0,
+                "retries": 0,
+                "retry_successes": 0,
+                "budget_exhausted": 0,
+                "gave_up": 0,
+            }
+        return stats
+
+    def backoff(self, retry: int) -> float:
+        """Full jitter: uniform in [0, min(max_delay, base_delay * 2**retry)]"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+
+    async def run(self, name: str, fetch: Callable[[], Awaitable[T]]) -> T:
+        """Run `fetch`, retrying retryable errors while attempts and budget remain"""
+        stats = self._platform_stats(name)
+        stats["fetches"] += 1
+        self.budget.deposit()
+
+        retry = 0
+        while True:
+            try:
+                result = await fetch()
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                if retry + 1 >= self.max_attempts:
+                    stats["gave_up"] += 1
+                    raise
+                if not self.budget.try_spend():
+                    stats["budget_exhausted"] += 1
+                    raise
+                delay = self.backoff(retry)
+                retry += 1
+                stats["retries"] += 1
+                logger.info(f"🔁 Retrying {name} fetch ({retry}/{self.max_attempts - 1}) in {delay:.2f}s: {e}")
+                await asyncio.sleep(delay)
+                continue
+            if retry:
+                stats["retry_successes"] += 1
+            return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "budget": self.budget.get_stats(),
+            "platforms": {name: dict(stats) for name, stats in self._stats.items()},
+        }
+
+
+__all__ = ["RetryPolicy", "is_retryable", "RETRYABLE_STATUSES"]
@@ -0,0 +1,246 @@
+"""
+Selector Extraction - Platform CSS selectors evaluated with lxml
+
+Each platform's CSS selectors are translated to XPath and compiled once, then
+evaluated against the page parsed incrementally by lxml as it streams in. The
+regex `PriceScanner` runs alongside and supplies any field the selectors do
+not find. Reading stops once the scanner is done and the price selector has
+matched, or after `selector_chars` of page text if it never does.
+
+Both only run when the page's structured data (JSON-LD, microdata or
+OpenGraph) does not settle the price by the end of <head>.
+"""
+
+import logging
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from price_extraction import DEFAULT_DELIVERY_TIME, SIGNALS, PriceScanner
+from structured_data import StructuredDataScanner, StructuredProduct
+
+try:
+    from lxml import etree
+    from cssselect import GenericTranslator, SelectorError
+    SELECTORS_AVAILABLE = True
+except ImportError:
+    SELECTORS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Selector matches are specific to the product, so they are trusted over a regex hit
+SELECTOR_CONFIDENCE = 0.95
+# Structured data is the retailer's own description of the offer
+STRUCTURED_CONFIDENCE = 0.97
+
+_NUMBER = re.compile(r'[0-9][0-9,]*(?:\.[0-9]+)?')
+_CURRENCY = re.compile(r'[₹$€£]|\brs\.?|\binr\b', re.IGNORECASE)
+_OUT_OF_STOCK = re.compile(
+    "|".join(pattern for kind, pattern in SIGNALS if kind == "out_of_stock"), re.IGNORECASE
+)
+
+# platform -> field -> compiled XPath, per thread: lxml XPath objects must
+# not be shared between the parse worker threads
+_local = threading.local()
+
+
+def compiled_selectors(platform: str, selectors: Dict[str, str]) -> Dict[str, Any]:
+    """Compile a platform's CSS selectors to XPath once per thread and cache them"""
+    if not SELECTORS_AVAILABLE:
+        return {}
+
+    cache: Dict[str, Dict[str, Any]] = getattr(_local, "compiled", None) or {}
+    _local.compiled = cache
+    compiled = cache.get(platform)
+    if compiled is None:
+        compiled = {}
+        translator = GenericTranslator()
+        for field_name, css in selectors.items():
+            try:
+                compiled[field_name] = etree.XPath(translator.css_to_xpath(css))
+            except (SelectorError, etree.XPathSyntaxError) as e:
+                logger.warning(f"⚠️ Invalid {field_name} selector for {platform}: {e}")
+        cache[platform] = compiled
+    return compiled
+
+
+def _parse_amount(text: str) -> Optional[float]:
+    match = _NUMBER.search(text)
+    if match is None:
+        return None
+    try:
+        return float(match.group().replace(',', ''))
+    except ValueError:
+        return None
+
+
+class PageExtractor:
+    """
+    Page consumer for `page_reader.read_page`: structured data first, then
+    selectors and regex scanning
+
+    Text is held back from the fallback extractors while the structured data
+    scanner reads <head> (at most `head_chars`); if it settles the price
+    there, they never run. The lxml parser and selectors are created on first
+    use, so they belong to the thread that parses the page.
+    """
+
+    def __init__(
+        self,
+        platform: str,
+        selectors: Optional[Dict[str, str]] = None,
+        head_chars: int = 128 * 1024,
+        selector_chars: int = 512 * 1024
+    ):
+        self.head_chars = head_chars
+        self.selector_chars = selector_chars
+        self.structured = StructuredDataScanner()
+        self.scanner = PriceScanner()
+        self.platform = platform
+        self.selectors = selectors or {}
+        self._xpaths: Dict[str, Any] = {}
+        self._parser: Optional[Any] = None
+        self._root: Optional[Any] = None  # Partial tree while the page streams in
+        self._fed = False
+        self._fallback_chars = 0
+        self._pending: List[str] = []  # Text not yet given to the fallback extractors
+        self._pending_chars = 0
+
+    def _structured_product(self) -> Optional[StructuredProduct]:
+        """The structured product once its price is settled"""
+        if not self.structured.done:
+            return None
+        product = self.structured.product()
+        return product if product.price is not None else None
+
+    def _feed_fallbacks(self, text: str, final: bool) -> bool:
+        if self._parser is None and self.selectors and SELECTORS_AVAILABLE:
+            self._xpaths = compiled_selectors(self.platform, self.selectors)
+            if self._xpaths:
+                self._parser = etree.HTMLPullParser(events=("start",), tag="html", recover=True)
+        if self._parser is not None and text:
+            self._parser.feed(text)
+            self._fed = True
+            for _, element in self._parser.read_events():
+                self._root = element
+        self._fallback_chars += len(text)
+
+        scanner_done = self.scanner.feed(text, final)
+        if final or self._parser is None or not scanner_done:
+            return scanner_done
+        # The regex scanner is satisfied, but selector values win over its matches
+        return self._fallback_chars >= self.selector_chars or self._has_selector_price()
+
+    def _has_selector_price(self) -> bool:
+        """Whether the price selector matched a complete element in the page so far"""
+        xpath = self._xpaths.get("price")
+        if xpath is None or self._root is None:
+            return False
+        for element in xpath(self._root):
+            # Text in the last element parsed may still be cut off mid-value
+            if not element.xpath("boolean(following::node())"):
+                return False
+            text = " ".join("".join(element.itertext()).split())
+            if text:
+                return bool(_parse_amount(text))
+        return False
+
+    def feed(self, text: str, final: bool = False) -> bool:
+        self.structured.feed(text, final)
+        if self._structured_product() is not None:
+            return True
+
+        if not (self.structured.head_done or final or self._pending_chars + len(text) > self.head_chars):
+            self._pending.append(text)
+            self._pending_chars += len(text)
+            return False
+        if self._pending:
+            text = "".join(self._pending) + text
+            self._pending = []
+            self._pending_chars = 0
+        return self._feed_fallbacks(text, final)
+
+    def _first_text(self, root: Any, field_name: str) -> Optional[str]:
+        xpath = self._xpaths.get(field_name)
+        if xpath is None:
+            return None
+        for element in xpath(root):
+            text = " ".join("".join(element.itertext()).split())
+            if text:
+                return text
+        return None
+
+    def _selected_fields(self) -> Dict[str, Any]:
+        """Fields found by the platform selectors in the page read so far"""
+        if self._parser is None or not self._fed:
+            return {}
+        try:
+            root = self._parser.close()
+        except etree.XMLSyntaxError:
+            return {}
+        if root is None:
+            return {}
+
+        selected: Dict[str, Any] = {}
+
+        price_text = self._first_text(root, "price")
+        price = _parse_amount(price_text) if price_text else None
+        if price:
+            selected["base_price"] = price
+
+        shipping_text = self._first_text(root, "shipping")
+        if shipping_text:
+            if "free" in shipping_text.lower():
+                selected["shipping_cost"] = 0.0
+            elif _CURRENCY.search(shipping_text):
+                shipping = _parse_amount(shipping_text)
+                if shipping is not None:
+                    selected["shipping_cost"] = shipping
+
+        availability_text = self._first_text(root, "availability")
+        if availability_text is not None:
+            selected["availability"] = not _OUT_OF_STOCK.search(availability_text)
+
+        return selected
+
+    def result(self) -> Dict[str, Any]:
+        """Structured data if it has the price, else selector values, else regex values"""
+        product = self._structured_product()
+        if product is not None:
+            info: Dict[str, Any] = {
+                "base_price": product.price,
+                "availability": product.availability is not False,
+                "delivery_time": DEFAULT_DELIVERY_TIME,
+                "deals": [],
+                "confidence": STRUCTURED_CONFIDENCE,
+                "source": product.source,
+            }
+        else:
+            product = self.structured.product()
+            info = self.scanner.result()
+            info["source"] = "regex"
+            selected = self._selected_fields()
+            info.update(selected)
+            if "base_price" in selected:
+                info["confidence"] = SELECTOR_CONFIDENCE
+                info["source"] = "selectors"
+
+        info.update({
+            "name": product.name,
+            "currency": product.currency,
+            "brand": product.brand,
+            "gtin": product.gtin,
+            "category": product.category,
+            "description": product.description,
+        })
+        return info
+
+
+def extract_page(html_content: str, platform: str, selectors: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Extract price information from a complete HTML document"""
+    extractor = PageExtractor(platform, selectors)
+    extractor.feed(html_content, final=True)
+    return extractor.result()
+
+
+__all__ = ["PageExtractor", "compiled_selectors", "extract_page", "SELECTORS_AVAILABLE"]
@@ -1,6 +1,9 @@
+import json
 import logging
 import time
-from typing import Dict, Any, List
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, Any, List
 
 from kafka_producer import (
     get_kafka_producer, 
@@ -9,9 +12,67 @@ from kafka_producer import (
     PricePredictionEvent,
     AnalysisResult
 )
+from config import settings
+from price_comparison import PlatformPrice, PriceComparisonService
+from redis_store import create_redis_client
+from volatility import PriceVolatilityTracker
+from stacksmart import StackSmartEngine
 
 logger = logging.getLogger(__name__)
 
+stacksmart_engine = StackSmartEngine()
+price_comparison_service = PriceComparisonService(
+    http_options={
+        "limit": settings.http_pool_limit,
+        "limit_per_host": settings.http_pool_limit_per_host,
+        "dns_cache_ttl": settings.http_dns_cache_ttl,
+        "keepalive_timeout": settings.http_keepalive_timeout,
+        "timeout": settings.http_timeout,
+    },
+    max_in_flight=settings.scrape_max_in_flight,
+    redis_client=create_redis_client(settings.redis_url) if settings.redis_enabled else None,
+    cache_max_entries=settings.price_cache_max_entries,
+    cache_max_bytes=settings.price_cache_max_bytes,
+    platform_cache_max_entries=settings.platform_cache_max_entries,
+    platform_cache_max_bytes=settings.platform_cache_max_bytes,
+    stale_while_revalidate=settings.price_stale_while_revalidate,
+    max_staleness=timedelta(seconds=settings.price_max_staleness),
+    volatility_tracker=PriceVolatilityTracker(
+        min_ttl=timedelta(seconds=settings.price_ttl_min),
+        max_ttl=timedelta(seconds=settings.price_ttl_max),
+        change_probability=settings.price_ttl_change_probability,
+    ),
+    refresh_options={
+        "budget_per_minute": settings.refresh_budget_per_minute,
+        "interval": settings.refresh_interval,
+        "lookahead": settings.refresh_lookahead,
+        "concurrency": settings.refresh_concurrency,
+    },
+    max_page_bytes=settings.scrape_max_page_bytes,
+    max_compression_ratio=settings.scrape_max_compression_ratio,
+    compare_deadline=settings.compare_deadline,
+    hedge_options={
+        "percentile": settings.hedge_percentile,
+        "max_hedge_ratio": settings.hedge_max_ratio,
+    } if settings.hedge_enabled else None,
+    retry_options={
+        "max_attempts": settings.retry_max_attempts,
+        "base_delay": settings.retry_base_delay,
+        "max_delay": settings.retry_max_delay,
+        "budget_ratio": settings.retry_budget_ratio,
+    },
+    breaker_options={
+        "failure_threshold": settings.breaker_failure_threshold,
+        "reset_timeout": settings.breaker_reset_timeout,
+        "half_open_probes": settings.breaker_half_open_probes,
+    },
+    negative_cache_ttl=settings.negative_cache_ttl,
+    parse_workers=settings.parse_workers,
+    parse_max_queue=settings.parse_max_queue,
+    parse_processes=settings.parse_processes,
+    loop_lag_interval=settings.loop_lag_interval,
+)
+
 async def get_product_details(url: str) -> Dict[str, Any]:
     """
     Extracts product details from a given URL and publishes detection event.
@@ -20,16 +81,8 @@ async def get_product_details(url: str) -> Dict[str, Any]:
     logger.info(f"Extracting product details for URL: {url}")
     
     try:
-        # Mock product extraction (in real implementation, this would scrape/analyze the URL)
-        product_data: Dict[str, Any] = {
-            "url": url,
-            "name": "AI-Detected Product",
-            "price": 99.99,
-            "currency": "USD",
-            "retailer": "example.com",
-            "category": "Electronics",
-            "description": "A high-quality product detected by AI"
-        }
+        # Structured data (JSON-LD / microdata / OpenGraph) first, selectors and regex as fallback
+        product_data = await price_comparison_service.fetch_product_details(url)
         
         processing_time = int((time.time() - start_time) * 1000)
         
@@ -38,13 +91,14 @@ async def get_product_details(url: str) -> Dict[str, Any]:
         detection_event = ProductDetectionEvent(
             product_id=f"prod_{hash(url) % 100000}",
             url=url,
-            title=product_data["name"],
-            description=product_data["description"],
+            title=product_data["name"] or "",
+            description=product_data["description"] or "",
             price=product_data["price"],
-            currency=product_data["currency"],
+            currency=product_data["currency"] or "USD",
             retailer=product_data["retailer"],
-            category=product_data["category"],
-            confidence_score=0.95,
+            category=product_data["category"] or "",
+            brand=product_data["brand"],
+            confidence_score=product_data["confidence"],
             analysis_result=AnalysisResult.SUCCESS,
             processing_time_ms=processing_time
         )
@@ -140,6 +194,13 @@ async def validate_stack_service(request: Any) -> Dict[str, Any]:
     logger.info("Validating deal stack")
     return {"is_valid": True}
 
+async def validate_stacks_service(request: Any) -> List[Dict[str, Any]]:
+    """
+    Validates a batch of candidate deal stacks against the same base price.
+    """
+    logger.info(f"Validating {len(request.stacks)} deal stacks")
+    return await stacksmart_engine.validate_deal_stacks(request.stacks, request.base_price)
+
 async def analyze_product_service(request: Any) -> Dict[str, Any]:
     """
     Placeholder for analyze_product_service.
@@ -163,33 +224,79 @@ async def detect_product_details(url: str) -> Dict[str, Any]:
     Detects product details from a given URL.
     """
     logger.info(f"Detecting product details for URL: {url}")
-    # In a real implementation, this would involve web scraping or calling a product API
+    details = await price_comparison_service.fetch_product_details(url)
     return {
-        "is_product_page": True,
+        "is_product_page": details["price"] > 0,
         "product_details": {
-            "name": "Real-Time Product",
-            "price": 123.45,
-            "currency": "USD",
+            "name": details["name"],
+            "price": details["price"],
+            "currency": details["currency"],
+            "brand": details["brand"],
+            "gtin": details["gtin"],
+            "availability": details["availability"],
         },
     }
 
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """One server-sent event with a JSON payload"""
+    payload = json.dumps(data, default=lambda value: value.isoformat() if isinstance(value, datetime) else str(value))
+    return f"event: {event}\ndata: {payload}\n\n"
+
+async def compare_prices_stream_service(request: Any) -> AsyncIterator[str]:
+    """
+    Streams a price comparison as server-sent events: one `price` event per
+    platform as it arrives, then a `summary` event (or an `error` event).
+    """
+    logger.info(f"Streaming price comparison for: {request.product_name}")
+    try:
+        async for item in price_comparison_service.compare_prices_stream(
+            request.product_name, request.product_urls, request.user_location, request.deadline
+        ):
+            if isinstance(item, PlatformPrice):
+                yield _sse_event("price", asdict(item))
+            else:
+                summary = asdict(item)
+                summary.pop("comparisons")
+                summary["platforms"] = len(item.comparisons)
+                yield _sse_event("summary", summary)
+    except Exception as e:
+        logger.error(f"Error streaming price comparison: {e}")
+        yield _sse_event("error", {"detail": str(e)})
+
 async def optimize_deals_service(request: Any) -> Dict[str, Any]:
     """
     Optimizes deals to find the best stack.
     """
-    logger.info("Optimizing deals")
-    # In a real implementation, this would involve complex optimization logic
-    final_price = request.base_price * 0.8 # a dummy 20% discount
-    total_savings = request.base_price - final_price
+    logger.info(f"Optimizing {len(request.available_coupons)} deals")
+    result = await stacksmart_engine.optimize_deals(
+        request.available_coupons, request.product_price, request.user_preferences
+    )
+    return asdict(result)
+
+async def optimize_deals_frontier_service(request: Any) -> Dict[str, Any]:
+    """
+    Computes the Pareto frontier of deal stacks and the stack it yields for the user's preferences.
+    """
+    logger.info(f"Computing deal frontier for {len(request.available_coupons)} deals")
+    frontier = await stacksmart_engine.optimize_deals_frontier(
+        request.available_coupons, request.product_price, request.user_preferences
+    )
+    selected = stacksmart_engine.select_from_frontier(
+        frontier, request.product_price, request.user_preferences
+    )
     return {
-        "deals": [],
-        "total_savings": total_savings,
-        "final_price": final_price,
-        "original_price": request.base_price,
-        "confidence": 0.95,
-        "application_order": ["optimized_deal"],
-        "warnings": [],
-        "processing_time": 0.1,
+        "frontier": [
+            {
+                "deal_ids": [deal.id for deal in point.deals],
+                "total_savings": point.total_savings,
+                "final_price": point.final_price,
+                "confidence": point.confidence,
+                "stack_size": point.stack_size,
+                "preference_score": point.preference_score,
+            }
+            for point in frontier
+        ],
+        "selected": asdict(selected),
     }
 
 async def startup_event():
@@ -203,6 +310,10 @@ async def startup_event():
         logger.info("✅ Kafka producer initialized successfully")
     else:
         logger.warning("⚠️ Kafka producer health check failed")
+    
+    # One pooled HTTP client per process for all retailer fetches
+    await price_comparison_service.start()
+    logger.info("✅ Price comparison HTTP client started")
 
 async def shutdown_event():
     """
@@ -211,3 +322,13 @@ async def shutdown_event():
     logger.info("AI service shutdown event")
     close_kafka_producer()
     logger.info("✅ Kafka producer closed")
+    await price_comparison_service.close()
+    logger.info("✅ HTTP client closed")
+
+def get_service_metrics() -> Dict[str, Any]:
+    """
+    Collects operational metrics from the AI service components.
+    """
+    return {
+        "price_comparison": price_comparison_service.get_stats(),
+    }
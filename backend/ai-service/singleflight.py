@@ -0,0 +1,158 @@
+"""
+Single-Flight - Coalescing of identical in-flight fetches
+
+Concurrent callers asking for the same key await one shared fetch instead of
+each starting their own. `RedisSingleFlight` extends this across workers with
+a Redis lock: the lock holder fetches and publishes the result, and the other
+workers wait for it.
+"""
+
+import asyncio
+import logging
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from redis_store import RELEASE_LOCK_SCRIPT
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """In-process request coalescing keyed by string"""
+
+    def __init__(self):
+        self._calls: Dict[str, "asyncio.Future[Any]"] = {}
+        self._stats: Dict[str, int] = {"calls": 0, "coalesced": 0}
+
+    async def do(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Run `fetch` once per key at a time; concurrent callers share its result"""
+        self._stats["calls"] += 1
+
+        shared = self._calls.get(key)
+        if shared is not None:
+            self._stats["coalesced"] += 1
+        else:
+            shared = asyncio.ensure_future(fetch())
+            self._calls[key] = shared
+            shared.add_done_callback(lambda done: self._finish(key, done))
+
+        # Shield so one caller giving up does not cancel the fetch for the others
+        return await asyncio.shield(shared)
+
+    async def close(self) -> None:
+        """Cancel shared fetches still running, e.g. ones every caller gave up on"""
+        calls = list(self._calls.values())
+        for shared in calls:
+            shared.cancel()
+        await asyncio.gather(*calls, return_exceptions=True)
+
+    def _finish(self, key: str, done: "asyncio.Future[Any]") -> None:
+        self._calls.pop(key, None)
+        # Every caller may have given up (e.g. a comparison deadline); the
+        # fetch already logged its failure, so just mark the exception retrieved
+        if not done.cancelled():
+            done.exception()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "in_flight": len(self._calls)}
+
+
+class RedisSingleFlight:
+    """
+    Cross-worker coalescing through a Redis lock and a short-lived shared result
+    """
+
+    def __init__(
+        self,
+        redis: Any,
+        encode: Callable[[Any], bytes],
+        decode: Callable[[bytes], Any],
+        lock_ttl: float = 15.0,
+        result_ttl: float = 5.0,
+        poll_interval: float = 0.05,
+        prefix: str = "dealmate:singleflight"
+    ):
+        self.redis = redis
+        self.encode = encode
+        self.decode = decode
+        self.lock_ttl = lock_ttl
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self.prefix = prefix
+        self._stats: Dict[str, int] = {
+            "leader": 0,
+            "takeovers": 0,
+            "follower_hits": 0,
+            "follower_fallbacks": 0,
+        }
+
+    async def do(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Fetch as the lock holder, or wait for the holder's published result
+
+        When the holder fails without publishing, its lock is released and the
+        waiting workers race to retake it: one becomes the new holder and the
+        rest keep waiting, so a failed fetch is retried once, not by everyone.
+        """
+        lock_key = f"{self.prefix}:lock:{key}"
+        result_key = f"{self.prefix}:result:{key}"
+
+        published = await self.redis.get(result_key)
+        if published is not None:
+            self._stats["follower_hits"] += 1
+            return self.decode(published)
+
+        loop = asyncio.get_running_loop()
+        waited = False
+        while True:
+            token = uuid.uuid4().hex
+            if await self.redis.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000)):
+                self._stats["takeovers" if waited else "leader"] += 1
+                try:
+                    value = await fetch()
+                    await self.redis.set(
+                        result_key, self.encode(value), px=int(self.result_ttl * 1000)
+                    )
+                    return value
+                finally:
+                    # Compare-and-delete in one step: the lock may have expired and
+                    # been taken by another worker since our fetch started
+                    await self.redis.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+
+            # Another worker holds the lock: wait for its result while the lock lives
+            waited = True
+            give_up_at = loop.time() + self.lock_ttl
+            lock_released = False
+            while loop.time() < give_up_at:
+                await asyncio.sleep(self.poll_interval)
+                published = await self.redis.get(result_key)
+                if published is not None:
+                    self._stats["follower_hits"] += 1
+                    return self.decode(published)
+                if not await self.redis.exists(lock_key):
+                    lock_released = True
+                    break
+            if not lock_released:
+                break
+
+        # The holder kept the lock past its TTL without publishing; fetch ourselves
+        self._stats["follower_fallbacks"] += 1
+        return await fetch()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self._stats)
+
+
+def coalesce(
+    local: SingleFlight,
+    remote: Optional[RedisSingleFlight],
+    key: str,
+    fetch: Callable[[], Awaitable[Any]]
+) -> Awaitable[Any]:
+    """Coalesce in-process first, then across workers when Redis is configured"""
+    if remote is None:
+        return local.do(key, fetch)
+    return local.do(key, lambda: remote.do(key, fetch))
+
+
+__all__ = ["SingleFlight", "RedisSingleFlight", "coalesce"]
@@ -5,12 +5,19 @@ This service implements the core StackSmart algorithm that identifies and combin
 stackable offers from various sources to create the most optimized deal for users.
 """
 
+import copy
+import json
 import logging
+import math
+from collections import OrderedDict
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 from datetime import datetime, timedelta
 
+from deal_terms import parse_terms
+from eligibility import compile_user_context, compile_deal_requirements, is_eligible
+
 logger = logging.getLogger(__name__)
 
 
@@ -49,6 +56,9 @@ class Deal:
     stackable: bool = True
     terms: List[str] = field(default_factory=lambda: [])
     priority: int = 0
+    eligibility: Tuple[Tuple[int, int], ...] = ()  # Compiled (group, domain) masks, see eligibility.py
+    excluded_eligibility: int = 0  # Cards/memberships the terms exclude, see eligibility.py
+    excluded_type_mask: int = 0  # Deal types this deal's terms forbid stacking with
 
 
 @dataclass
@@ -61,6 +71,18 @@ class StackedDealResult:
     application_order: List[str]
     warnings: List[str]
     processing_time: float
+    mode: str = "exact"  # 'exact' or 'approximate'
+    optimality_gap: Optional[float] = None  # Upper bound on the score gap to the optimum
+
+
+@dataclass
+class ParetoPoint:
+    deals: List[Deal]
+    total_savings: float
+    final_price: float
+    confidence: float
+    stack_size: int
+    preference_score: float = 0.0  # Preference bonus under the profile the frontier was built for
 
 
 class StackSmartEngine:
@@ -71,6 +93,12 @@ class StackSmartEngine:
     def __init__(self):
         self.compatibility_matrix = self._build_compatibility_matrix()
         self.optimization_rules = self._build_optimization_rules()
+        self.type_bits = {deal_type: 1 << i for i, deal_type in enumerate(DealType)}
+        self.exclusion_masks = self._build_exclusion_masks()
+        self.validation_cache: "OrderedDict[Tuple[Any, ...], Dict[str, Any]]" = OrderedDict()
+        self.validation_cache_size = 256
+        self.eligibility_cache: "OrderedDict[str, Tuple[int, ...]]" = OrderedDict()
+        self.eligibility_cache_size = 1024
         
     def _build_compatibility_matrix(self) -> Dict[Tuple[DealType, DealType], CompatibilityRule]:
         """Build compatibility matrix for different deal types"""
@@ -109,6 +137,16 @@ class StackSmartEngine:
             
         return matrix
     
+    def _build_exclusion_masks(self) -> Dict[DealType, int]:
+        """Build per-type bitmasks of the deal types each type cannot be stacked with"""
+        masks: Dict[DealType, int] = {deal_type: 0 for deal_type in DealType}
+        
+        for (first, second), rule in self.compatibility_matrix.items():
+            if rule == CompatibilityRule.EXCLUSIVE:
+                masks[first] |= self.type_bits[second]
+                
+        return masks
+    
     def _build_optimization_rules(self) -> Dict[str, Any]:
         """Build optimization rules for deal application order"""
         return {
@@ -124,16 +162,24 @@ class StackSmartEngine:
             ],
             "max_stack_size": 5,
             "min_confidence_threshold": 0.6,
+            "max_exact_combinations": 200_000,  # Larger searches switch to approximate mode
+            "exact_combination_cost": 0.00002,  # Estimated seconds to evaluate one combination
+            "max_local_search_passes": 50,
         }
     
     async def optimize_deals(
         self, 
         available_deals: List[Dict[str, Any]], 
         base_price: float,
-        user_context: Optional[Dict[str, Any]] = None
+        user_context: Optional[Dict[str, Any]] = None,
+        deadline: Optional[float] = None
     ) -> StackedDealResult:
         """
-        Main optimization function that finds the best deal combination
+        Main optimization function that finds the best deal combination.
+        
+        `deadline` is the time budget in seconds. Inputs too large to search
+        exhaustively within it (or within `max_exact_combinations`) are solved
+        with the approximate greedy + local search optimizer instead.
         """
         start_time = datetime.now()
         
@@ -144,18 +190,28 @@ class StackSmartEngine:
             # Filter valid deals
             valid_deals = self._filter_valid_deals(deals, base_price, user_context)
             
-            # Generate all possible combinations
-            combinations = self._generate_combinations(valid_deals)
-            
-            # Evaluate each combination
-            best_combination = await self._evaluate_combinations(
-                combinations, base_price, user_context
-            )
+            if self._should_approximate(len(valid_deals), deadline):
+                best_combination, optimality_gap = self._approximate_best_combination(
+                    valid_deals, base_price, user_context, start_time, deadline
+                )
+                mode = "approximate"
+            else:
+                # Generate all possible combinations
+                combinations = self._generate_combinations(valid_deals)
+                
+                # Evaluate each combination
+                best_combination = await self._evaluate_combinations(
+                    combinations, base_price, user_context
+                )
+                optimality_gap = 0.0
+                mode = "exact"
             
             # Calculate final result
             result = self._calculate_final_result(
                 best_combination, base_price, start_time
             )
+            result.mode = mode
+            result.optimality_gap = optimality_gap
             
             logger.info(f"StackSmart: Optimized {len(available_deals)} deals into {len(result.deals)} stacked deals")
             return result
@@ -174,6 +230,92 @@ class StackSmartEngine:
                 processing_time=(datetime.now() - start_time).total_seconds()
             )
     
+    async def optimize_deals_frontier(
+        self,
+        available_deals: List[Dict[str, Any]],
+        base_price: float,
+        user_context: Optional[Dict[str, Any]] = None
+    ) -> List[ParetoPoint]:
+        """
+        Find the Pareto frontier of expected savings (savings x confidence) and preference
+        bonus in a single search.
+        
+        The best stack for the preferences in `user_context` is always on the frontier, so
+        `select_from_frontier` finds it without re-scoring every combination; the other
+        points are the trade-offs between saving more and matching preferences more.
+        """
+        deals = self._parse_deals(available_deals)
+        valid_deals = self._filter_valid_deals(deals, base_price, user_context)
+        
+        # Keep the exhaustive search within budget by dropping the weakest deals
+        if self._should_approximate(len(valid_deals), None):
+            valid_deals = sorted(
+                valid_deals,
+                key=lambda d: self._calculate_combination_savings([d], base_price)[0],
+                reverse=True
+            )
+            while valid_deals and self._should_approximate(len(valid_deals), None):
+                valid_deals.pop()
+        
+        points: List[ParetoPoint] = []
+        for combination in self._generate_combinations(valid_deals):
+            savings, final_price = self._calculate_combination_savings(combination, base_price)
+            points.append(ParetoPoint(
+                deals=combination,
+                total_savings=savings,
+                final_price=final_price,
+                confidence=self._calculate_combination_confidence(combination),
+                stack_size=len(combination),
+                preference_score=(
+                    self._calculate_preference_bonus(combination, user_context) if user_context else 0.0
+                )
+            ))
+            
+        return self._pareto_frontier(points)
+    
+    def _pareto_frontier(self, points: List[ParetoPoint]) -> List[ParetoPoint]:
+        """
+        Skyline of expected savings (max) and preference score (max), smallest stack on ties.
+        
+        After sorting by expected savings, a point survives only if its preference score
+        beats every point before it, so the frontier is built in O(n log n).
+        """
+        frontier: List[ParetoPoint] = []
+        best_preference = -math.inf
+        
+        ordered = sorted(
+            points,
+            key=lambda p: (-p.total_savings * p.confidence, -p.preference_score, p.stack_size)
+        )
+        for point in ordered:
+            if point.preference_score > best_preference:
+                frontier.append(point)
+                best_preference = point.preference_score
+                
+        return frontier
+    
+    def select_from_frontier(
+        self,
+        frontier: List[ParetoPoint],
+        base_price: float,
+        user_context: Optional[Dict[str, Any]] = None
+    ) -> StackedDealResult:
+        """Pick the best frontier point for a preference profile without re-optimizing"""
+        start_time = datetime.now()
+        best_combination: List[Deal] = []
+        best_score = 0.0
+        
+        for point in frontier:
+            score = point.total_savings * point.confidence
+            if user_context:
+                # Re-scored, so a frontier built for other preferences can be re-ranked
+                score += self._calculate_preference_bonus(point.deals, user_context)
+            if score > best_score:
+                best_score = score
+                best_combination = point.deals
+                
+        return self._calculate_final_result(best_combination, base_price, start_time)
+    
     def _parse_deals(self, deal_data: List[Dict[str, Any]]) -> List[Deal]:
         """Parse input deal data into Deal objects"""
         deals: List[Deal] = []
@@ -196,12 +338,40 @@ class StackSmartEngine:
                     terms=data.get('terms', []),
                     priority=data.get('priority', 0)
                 )
+                self._apply_term_constraints(deal)
                 deals.append(deal)
             except Exception as e:
                 logger.warning(f"Failed to parse deal: {data}, error: {e}")
                 
         return deals
     
+    def _apply_term_constraints(self, deal: Deal) -> None:
+        """Fold constraints parsed from the deal's free-text terms into the deal"""
+        constraints = parse_terms(deal.terms)
+        
+        if constraints.min_order is not None:
+            deal.min_purchase = max(deal.min_purchase or 0.0, constraints.min_order)
+        if constraints.max_discount is not None and deal.value_type == 'percentage':
+            deal.max_discount = min(deal.max_discount or float('inf'), constraints.max_discount)
+            
+        if constraints.standalone:
+            deal.excluded_type_mask = sum(self.type_bits.values())
+        else:
+            for deal_type in constraints.not_combinable_with:
+                deal.excluded_type_mask |= self.type_bits[DealType(deal_type)]
+                
+        deal.eligibility = compile_deal_requirements(
+            constraints.eligibility_bits,
+            requires_card=constraints.requires_card or (
+                deal.deal_type == DealType.CARD_OFFER
+                and any('card' in term.lower() for term in deal.terms)
+            ),
+            requires_membership=(
+                constraints.requires_membership or deal.deal_type == DealType.MEMBERSHIP
+            )
+        )
+        deal.excluded_eligibility = constraints.excluded_bits
+    
     def _filter_valid_deals(
         self, 
         deals: List[Deal], 
@@ -210,6 +380,7 @@ class StackSmartEngine:
     ) -> List[Deal]:
         """Filter deals based on validity and user context"""
         valid_deals: List[Deal] = []
+        user_bits = self._compile_user_eligibility(user_context)
         
         for deal in deals:
             # Check minimum purchase requirement
@@ -225,36 +396,48 @@ class StackSmartEngine:
                 continue
                 
             # Check user context (e.g., card availability, membership status)
-            if not self._check_user_eligibility(deal, user_context):
+            if not self._check_user_eligibility(deal, user_bits):
                 continue
                 
             valid_deals.append(deal)
             
         return valid_deals
     
+    def _compile_user_eligibility(
+        self,
+        user_context: Optional[Dict[str, Any]]
+    ) -> Optional[Tuple[int, ...]]:
+        """Compile the user's cards and memberships into per-card bitsets, cached per session"""
+        if not user_context:
+            return None
+            
+        cache_key = json.dumps(
+            [
+                user_context.get('session_id'),
+                user_context.get('cards') or [],
+                user_context.get('memberships') or [],
+            ],
+            sort_keys=True,
+            default=str
+        )
+        user_bits = self.eligibility_cache.get(cache_key)
+        if user_bits is None:
+            user_bits = compile_user_context(user_context)
+            self.eligibility_cache[cache_key] = user_bits
+            if len(self.eligibility_cache) > self.eligibility_cache_size:
+                self.eligibility_cache.popitem(last=False)
+        else:
+            self.eligibility_cache.move_to_end(cache_key)
+            
+        return user_bits
+    
     def _check_user_eligibility(
         self, 
         deal: Deal, 
-        user_context: Optional[Dict[str, Any]]
+        user_bits: Optional[Tuple[int, ...]]
     ) -> bool:
-        """Check if user is eligible for the deal"""
-        if not user_context:
-            return True
-            
-        # Check card-specific offers
-        if deal.deal_type == DealType.CARD_OFFER:
-            user_cards = user_context.get('cards', [])
-            required_card = deal.terms and any('card' in term.lower() for term in deal.terms)
-            if required_card and not user_cards:
-                return False
-                
-        # Check membership requirements
-        if deal.deal_type == DealType.MEMBERSHIP:
-            memberships = user_context.get('memberships', [])
-            if not memberships:
-                return False
-                
-        return True
+        """Check if user is eligible for the deal (card network/issuer, membership)"""
+        return is_eligible(deal.eligibility, user_bits, deal.excluded_eligibility)
     
     def _generate_combinations(self, deals: List[Deal]) -> List[List[Deal]]:
         """Generate all valid deal combinations"""
@@ -287,16 +470,17 @@ class StackSmartEngine:
         """Check if a combination of deals is valid (stackable)"""
         for i, deal1 in enumerate(deals):
             for deal2 in deals[i+1:]:
-                compatibility = self.compatibility_matrix.get(
-                    (deal1.deal_type, deal2.deal_type),
-                    CompatibilityRule.CONDITIONAL
-                )
-                
-                if compatibility == CompatibilityRule.EXCLUSIVE:
+                if self._exclusion_mask(deal1) & self.type_bits[deal2.deal_type]:
+                    return False
+                if self._exclusion_mask(deal2) & self.type_bits[deal1.deal_type]:
                     return False
                     
         return True
     
+    def _exclusion_mask(self, deal: Deal) -> int:
+        """Deal types a deal cannot be stacked with, by type rules and by its own terms"""
+        return self.exclusion_masks[deal.deal_type] | deal.excluded_type_mask
+    
     async def _evaluate_combinations(
         self, 
         combinations: List[List[Deal]], 
@@ -309,23 +493,7 @@ class StackSmartEngine:
         
         for combination in combinations:
             try:
-                # Calculate savings for this combination
-                savings, _ = self._calculate_combination_savings(
-                    combination, base_price
-                )
-                
-                # Calculate confidence score
-                confidence = self._calculate_combination_confidence(combination)
-                
-                # Calculate overall score (savings weighted by confidence)
-                score = savings * confidence
-                
-                # Consider user preferences
-                if user_context:
-                    preference_bonus = self._calculate_preference_bonus(
-                        combination, user_context
-                    )
-                    score += preference_bonus
+                score = self._score_combination(combination, base_price, user_context)
                 
                 if score > best_score:
                     best_score = score
@@ -336,6 +504,145 @@ class StackSmartEngine:
                 
         return best_combination
     
+    def _score_combination(
+        self,
+        combination: List[Deal],
+        base_price: float,
+        user_context: Optional[Dict[str, Any]]
+    ) -> float:
+        """Score a combination: savings weighted by confidence plus preference bonus"""
+        # Calculate savings for this combination
+        savings, _ = self._calculate_combination_savings(combination, base_price)
+        
+        # Calculate confidence score
+        confidence = self._calculate_combination_confidence(combination)
+        
+        # Calculate overall score (savings weighted by confidence)
+        score = savings * confidence
+        
+        # Consider user preferences
+        if user_context:
+            score += self._calculate_preference_bonus(combination, user_context)
+            
+        return score
+    
+    def _should_approximate(self, deal_count: int, deadline: Optional[float]) -> bool:
+        """Decide whether an exhaustive search fits the combination and time budgets"""
+        max_size = min(deal_count, self.optimization_rules["max_stack_size"])
+        combination_count = sum(math.comb(deal_count, size) for size in range(1, max_size + 1))
+        
+        budget = self.optimization_rules["max_exact_combinations"]
+        if deadline is not None:
+            budget = min(
+                budget, int(deadline / self.optimization_rules["exact_combination_cost"])
+            )
+            
+        return combination_count > budget
+    
+    def _approximate_best_combination(
+        self,
+        deals: List[Deal],
+        base_price: float,
+        user_context: Optional[Dict[str, Any]],
+        start_time: datetime,
+        deadline: Optional[float]
+    ) -> Tuple[List[Deal], Optional[float]]:
+        """Build a greedy stack by marginal score, then improve it with swap and drop moves"""
+        max_size = self.optimization_rules["max_stack_size"]
+        priority_order = self.optimization_rules["priority_order"]
+        candidates = sorted(deals, key=lambda d: priority_order.index(d.deal_type))
+        
+        def score(stack: List[Deal]) -> float:
+            return self._score_combination(stack, base_price, user_context) if stack else 0.0
+        
+        def out_of_time() -> bool:
+            return (
+                deadline is not None
+                and (datetime.now() - start_time).total_seconds() >= deadline
+            )
+        
+        # Greedy construction: add the deal with the best marginal score until nothing helps.
+        # Past the deadline construction stops once some deal is in hand, keeping the best seen
+        stack: List[Deal] = []
+        best_score = 0.0
+        timed_out = False
+        while len(stack) < max_size and not timed_out:
+            best_addition: Optional[Deal] = None
+            best_addition_score = best_score
+            for deal in candidates:
+                if (stack or best_addition is not None) and out_of_time():
+                    timed_out = True
+                    break
+                if deal in stack or not self._is_valid_combination(stack + [deal]):
+                    continue
+                candidate_score = score(stack + [deal])
+                if candidate_score > best_addition_score:
+                    best_addition = deal
+                    best_addition_score = candidate_score
+            if best_addition is None:
+                break
+            stack.append(best_addition)
+            best_score = best_addition_score
+        
+        # Local search: first-improvement swap and drop moves
+        for _ in range(self.optimization_rules["max_local_search_passes"]):
+            if out_of_time():
+                break
+            improved = False
+            for i in range(len(stack)):
+                rest = stack[:i] + stack[i + 1:]
+                neighbours = [rest] + [
+                    rest + [deal] for deal in candidates if deal not in stack
+                ]
+                for neighbour in neighbours:
+                    if out_of_time():
+                        break
+                    if not self._is_valid_combination(neighbour):
+                        continue
+                    neighbour_score = score(neighbour)
+                    if neighbour_score > best_score:
+                        stack, best_score, improved = neighbour, neighbour_score, True
+                        break
+                if improved:
+                    break
+            if not improved:
+                break
+        
+        return stack, self._optimality_gap_bound(deals, base_price, user_context, best_score)
+    
+    def _optimality_gap_bound(
+        self,
+        deals: List[Deal],
+        base_price: float,
+        user_context: Optional[Dict[str, Any]],
+        achieved_score: float
+    ) -> Optional[float]:
+        """Upper bound on how far `achieved_score` can be from the best possible score"""
+        if not deals:
+            return 0.0
+            
+        max_size = self.optimization_rules["max_stack_size"]
+        
+        # A deal never saves more inside a stack than on its own against the base price,
+        # and a stack's confidence never exceeds its most confident deal
+        standalone_savings = sorted(
+            (self._calculate_combination_savings([deal], base_price)[0] for deal in deals),
+            reverse=True
+        )
+        savings_bound = sum(standalone_savings[:max_size])
+        if all(deal.value_type in ('percentage', 'fixed') for deal in deals):
+            savings_bound = min(savings_bound, base_price)
+        
+        score_bound = savings_bound * max(deal.confidence for deal in deals)
+        if user_context:
+            bonuses = sorted(
+                (self._calculate_preference_bonus([deal], user_context) for deal in deals),
+                reverse=True
+            )
+            score_bound += sum(bonuses[:max_size])
+            
+        return max(0.0, score_bound - achieved_score)
+    
     def _calculate_combination_savings(
         self, 
         deals: List[Deal], 
@@ -486,6 +793,93 @@ class StackSmartEngine:
                 "suggestions": []
             }
     
+    async def validate_deal_stacks(
+        self,
+        stacks: List[List[Dict[str, Any]]],
+        base_price: float
+    ) -> List[Dict[str, Any]]:
+        """Validate several candidate deal stacks in one pass, parsing each distinct deal once"""
+        # Parse the union of deals across all stacks
+        deal_index: Dict[str, int] = {}
+        parsed: List[Optional[Deal]] = []
+        stack_keys: List[Tuple[str, ...]] = []
+        
+        for stack in stacks:
+            keys: List[str] = []
+            for data in stack:
+                key = self._deal_key(data)
+                if key not in deal_index:
+                    deal_index[key] = len(parsed)
+                    parsed_deal = self._parse_deals([data])
+                    parsed.append(parsed_deal[0] if parsed_deal else None)
+                keys.append(key)
+            stack_keys.append(tuple(keys))
+        
+        results: List[Dict[str, Any]] = []
+        for stack_key in stack_keys:
+            cache_key = (stack_key, base_price)
+            cached = self.validation_cache.get(cache_key)
+            if cached is not None:
+                self.validation_cache.move_to_end(cache_key)
+                results.append(copy.deepcopy(cached))
+                continue
+            
+            stack_deals = [
+                deal for deal in (parsed[deal_index[key]] for key in stack_key) if deal is not None
+            ]
+            result = self._validate_parsed_stack(stack_deals, base_price)
+            
+            self.validation_cache[cache_key] = result
+            if len(self.validation_cache) > self.validation_cache_size:
+                self.validation_cache.popitem(last=False)
+            results.append(copy.deepcopy(result))
+            
+        return results
+    
+    def _validate_parsed_stack(self, deals: List[Deal], base_price: float) -> Dict[str, Any]:
+        """Validate an already parsed deal stack using the type exclusion bitmasks"""
+        try:
+            # Union of deal types in the stack, plus types that appear more than once
+            stack_mask = 0
+            repeated_mask = 0
+            for deal in deals:
+                bit = self.type_bits[deal.deal_type]
+                if stack_mask & bit:
+                    repeated_mask |= bit
+                stack_mask |= bit
+            
+            for deal in deals:
+                bit = self.type_bits[deal.deal_type]
+                others_mask = stack_mask if repeated_mask & bit else stack_mask & ~bit
+                if self._exclusion_mask(deal) & others_mask:
+                    return {
+                        "valid": False,
+                        "error": "Deal combination is not stackable",
+                        "suggestions": []
+                    }
+            
+            savings, final_price = self._calculate_combination_savings(deals, base_price)
+            confidence = self._calculate_combination_confidence(deals)
+            
+            return {
+                "valid": True,
+                "total_savings": savings,
+                "final_price": final_price,
+                "confidence": confidence,
+                "warnings": self._generate_stack_warnings(deals)
+            }
+            
+        except Exception as e:
+            return {
+                "valid": False,
+                "error": f"Validation failed: {str(e)}",
+                "suggestions": []
+            }
+    
+    def _deal_key(self, data: Dict[str, Any]) -> str:
+        """Generate a stable identity key for raw deal data"""
+        return json.dumps(data, sort_keys=True, default=str)
+    
     def _generate_stack_warnings(self, deals: List[Deal]) -> List[str]:
         """Generate warnings for a deal stack"""
         warnings: List[str] = []
@@ -507,4 +901,4 @@ class StackSmartEngine:
 
 
 # Export the main class
-__all__ = ["StackSmartEngine", "Deal", "DealType", "StackedDealResult"]
+__all__ = ["StackSmartEngine", "Deal", "DealType", "StackedDealResult", "ParetoPoint"]
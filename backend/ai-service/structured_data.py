@@ -0,0 +1,306 @@
+"""
+Structured Data - schema.org JSON-LD, OpenGraph and microdata product metadata
+
+Most retailer pages describe the product in machine-readable metadata near
+the top of the document. `StructuredDataScanner` finds these blocks in
+streamed page text with a few literal-anchored patterns (no DOM parse) and
+reports done as soon as a price is known, so the rest of the page need not
+be read or parsed.
+"""
+
+import json
+import logging
+import re
+from dataclasses import dataclass, asdict, fields
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+_JSON_LD = re.compile(
+    r'<script\b[^>]*\btype\s*=\s*["\']?application/ld\+json["\']?[^>]*>(.*?)</script\s*>',
+    re.IGNORECASE | re.DOTALL
+)
+_JSON_LD_START = re.compile(r'<script\b[^>]*application/ld\+json', re.IGNORECASE)
+_SCRIPT_END = re.compile(r'</script\s*>', re.IGNORECASE)
+_HEAD_END = re.compile(r'</head\s*>|<body\b', re.IGNORECASE)
+_META = re.compile(r'<meta\b[^>]*>', re.IGNORECASE)
+_ITEMPROP = re.compile(r'<(\w+)\b[^>]*\bitemprop\s*=[^>]*>([^<]*)', re.IGNORECASE)
+_ATTRIBUTE = re.compile(r'([\w:.-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+))')
+_NUMBER = re.compile(r'[0-9][0-9,]*(?:\.[0-9]+)?')
+
+# schema.org ItemAvailability values (and OpenGraph spellings) that mean "cannot buy now"
+UNAVAILABLE = {"outofstock", "soldout", "discontinued", "oos", "out of stock"}
+
+GTIN_KEYS = ("gtin13", "gtin", "gtin12", "gtin14", "gtin8", "isbn")
+
+OPENGRAPH_FIELDS = {
+    "og:title": "name",
+    "og:description": "description",
+    "product:price:amount": "price",
+    "og:price:amount": "price",
+    "product:price:currency": "currency",
+    "og:price:currency": "currency",
+    "product:availability": "availability",
+    "og:availability": "availability",
+    "product:brand": "brand",
+    "og:brand": "brand",
+    "product:ean": "gtin",
+    "product:upc": "gtin",
+    "product:gtin": "gtin",
+    "product:isbn": "gtin",
+    "product:category": "category",
+}
+
+MICRODATA_FIELDS = {
+    "name": "name",
+    "description": "description",
+    "price": "price",
+    "lowprice": "price",
+    "pricecurrency": "currency",
+    "availability": "availability",
+    "brand": "brand",
+    "category": "category",
+    **{key: "gtin" for key in GTIN_KEYS},
+}
+
+
+@dataclass
+class StructuredProduct:
+    name: Optional[str] = None
+    description: Optional[str] = None
+    price: Optional[float] = None
+    currency: Optional[str] = None
+    availability: Optional[bool] = None
+    brand: Optional[str] = None
+    gtin: Optional[str] = None
+    category: Optional[str] = None
+    source: Optional[str] = None  # Where the price came from: json-ld, microdata or opengraph
+
+    def merge(self, other: "StructuredProduct") -> None:
+        """Fill fields still missing from a lower-priority source"""
+        for field_info in fields(self):
+            if getattr(self, field_info.name) is None:
+                setattr(self, field_info.name, getattr(other, field_info.name))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _parse_price(value: Any) -> Optional[float]:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        match = _NUMBER.search(value)
+        if match:
+            try:
+                return float(match.group().replace(',', ''))
+            except ValueError:
+                return None
+    return None
+
+
+def _parse_availability(value: Any) -> Optional[bool]:
+    if not isinstance(value, str) or not value.strip():
+        return None
+    # "https://schema.org/InStock" -> "instock"
+    token = value.strip().rstrip("/").rsplit("/", 1)[-1].lower()
+    return token not in UNAVAILABLE
+
+
+def _text(value: Any) -> Optional[str]:
+    if isinstance(value, dict):
+        value = value.get("name")
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, (str, int, float)) and not isinstance(value, bool):
+        text = " ".join(str(value).split())
+        return text or None
+    return None
+
+
+def _json_ld_nodes(data: Any) -> Iterator[Dict[str, Any]]:
+    """Every object in a JSON-LD document, including @graph members"""
+    if isinstance(data, list):
+        for item in data:
+            yield from _json_ld_nodes(item)
+    elif isinstance(data, dict):
+        yield data
+        if "@graph" in data:
+            yield from _json_ld_nodes(data["@graph"])
+
+
+def _is_type(node: Dict[str, Any], type_name: str) -> bool:
+    types = node.get("@type")
+    types = types if isinstance(types, list) else [types]
+    return any(isinstance(t, str) and t.rsplit("/", 1)[-1] == type_name for t in types)
+
+
+def _product_from_json_ld(node: Dict[str, Any]) -> StructuredProduct:
+    product = StructuredProduct(
+        name=_text(node.get("name")),
+        description=_text(node.get("description")),
+        brand=_text(node.get("brand")),
+        category=_text(node.get("category")),
+        gtin=next((_text(node[key]) for key in GTIN_KEYS if node.get(key)), None),
+    )
+
+    offers = node.get("offers")
+    for offer in (offers if isinstance(offers, list) else [offers]):
+        if not isinstance(offer, dict):
+            continue
+        price = _parse_price(offer.get("price", offer.get("lowPrice")))
+        if price is None and isinstance(offer.get("priceSpecification"), dict):
+            price = _parse_price(offer["priceSpecification"].get("price"))
+        if price is None:
+            continue
+        product.price = price
+        product.currency = _text(offer.get("priceCurrency"))
+        product.availability = _parse_availability(offer.get("availability"))
+        product.source = "json-ld"
+        break
+
+    return product
+
+
+def _attributes(tag: str) -> Dict[str, str]:
+    return {
+        match.group(1).lower(): next(group for group in match.groups()[1:] if group is not None)
+        for match in _ATTRIBUTE.finditer(tag)
+    }
+
+
+def _assign(product: StructuredProduct, field_name: str, value: str) -> None:
+    if getattr(product, field_name) is not None:
+        return
+    if field_name == "price":
+        product.price = _parse_price(value)
+    elif field_name == "availability":
+        product.availability = _parse_availability(value)
+    else:
+        setattr(product, field_name, _text(value))
+
+
+class StructuredDataScanner:
+    """
+    Page consumer for `page_reader.read_page` collecting structured product metadata
+
+    Text from the last tag of a chunk onwards, and any unterminated JSON-LD
+    block, is held back until the rest of it has been fed.
+    """
+
+    def __init__(self, max_block_chars: int = 512 * 1024):
+        self.max_block_chars = max_block_chars
+        self.done = False
+        self.json_ld = StructuredProduct()
+        self.microdata = StructuredProduct()
+        self.opengraph = StructuredProduct()
+        self._buffer = ""
+        self._head_done = False
+
+    def _scan_json_ld(self, text: str) -> None:
+        for match in _JSON_LD.finditer(text):
+            if self.json_ld.price is not None:
+                return
+            try:
+                data = json.loads(match.group(1))
+            except ValueError:
+                continue
+            for node in _json_ld_nodes(data):
+                if _is_type(node, "Product") or _is_type(node, "ProductGroup"):
+                    candidate = _product_from_json_ld(node)
+                    self.json_ld.merge(candidate)
+                    if candidate.price is not None:
+                        self.json_ld.price = candidate.price
+                        self.json_ld.source = "json-ld"
+                        return
+
+    def _scan_tags(self, text: str) -> None:
+        for match in _META.finditer(text):
+            attributes = _attributes(match.group())
+            content = attributes.get("content")
+            if content is None:
+                continue
+            key = (attributes.get("property") or attributes.get("name") or "").lower()
+            if key in OPENGRAPH_FIELDS:
+                _assign(self.opengraph, OPENGRAPH_FIELDS[key], content)
+            itemprop = attributes.get("itemprop", "").lower()
+            if itemprop in MICRODATA_FIELDS:
+                _assign(self.microdata, MICRODATA_FIELDS[itemprop], content)
+
+        for match in _ITEMPROP.finditer(text):
+            if match.group(1).lower() == "meta":
+                continue  # Handled with the other meta tags
+            attributes = _attributes(match.group())
+            itemprop = attributes.get("itemprop", "").lower()
+            if itemprop not in MICRODATA_FIELDS:
+                continue
+            value = attributes.get("content") or attributes.get("href") or match.group(2)
+            if value and value.strip():
+                _assign(self.microdata, MICRODATA_FIELDS[itemprop], value)
+
+        if self.opengraph.price is not None:
+            self.opengraph.source = "opengraph"
+        if self.microdata.price is not None:
+            self.microdata.source = "microdata"
+
+    def feed(self, text: str, final: bool = False) -> bool:
+        """Scan the next chunk of page text; returns True once the price is settled"""
+        if self.done:
+            return True
+
+        buffer = self._buffer + text
+        scan_end = len(buffer)
+        if not final:
+            # The last tag (and the text after it) may continue in the next chunk
+            last_tag = buffer.rfind("<")
+            if last_tag != -1:
+                scan_end = last_tag
+            last_open = None
+            for last_open in _JSON_LD_START.finditer(buffer, 0, scan_end):
+                pass
+            if (
+                last_open is not None
+                and _SCRIPT_END.search(buffer, last_open.start(), scan_end) is None
+                and scan_end - last_open.start() <= self.max_block_chars
+            ):
+                scan_end = last_open.start()
+
+        scanned = buffer[:scan_end]
+        self._scan_json_ld(scanned)
+        self._scan_tags(scanned)
+        self._buffer = buffer[scan_end:]
+        if not self._head_done and _HEAD_END.search(scanned):
+            self._head_done = True
+
+        # JSON-LD is preferred, so an OpenGraph/microdata price only ends the scan once <head> is read
+        self.done = final or self.json_ld.price is not None or (
+            self._head_done and self.product().price is not None
+        )
+        return self.done
+
+    @property
+    def head_done(self) -> bool:
+        """Whether the end of <head> has been scanned"""
+        return self._head_done
+
+    def product(self) -> StructuredProduct:
+        """JSON-LD first, then microdata, then OpenGraph for anything still missing"""
+        product = StructuredProduct()
+        for source in (self.json_ld, self.microdata, self.opengraph):
+            if product.price is None and source.price is not None:
+                product.price = source.price
+                product.currency = source.currency
+                product.availability = source.availability
+                product.source = source.source
+            product.merge(source)
+        return product
+
+
+def extract_structured_product(html_content: str) -> StructuredProduct:
+    """Structured product metadata from a complete HTML document"""
+    scanner = StructuredDataScanner()
+    scanner.feed(html_content, final=True)
+    return scanner.product()
+
+
+__all__ = ["StructuredDataScanner", "StructuredProduct", "extract_structured_product"]
@@ -0,0 +1,210 @@
+"""
+W-TinyLFU Cache - Size- and memory-bounded cache with frequency-aware admission
+
+New entries land in a small LRU window. When the window overflows, its oldest
+entry only enters the main segmented LRU if it has been used more often than
+the entry it would replace, according to an aging count-min sketch. One-off
+lookups therefore cannot push hot entries out of the cache.
+"""
+
+import pickle
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class CountMinSketch:
+    """Approximate access frequencies with periodic halving (aging)"""
+
+    MAX_COUNT = 15
+    # Odd 64-bit multipliers, one per row, for multiply-shift hashing
+    SEEDS = (0x9E3779B97F4A7C15, 0xBF58476D1CE4E5B9, 0x94D049BB133111EB, 0xD6E8FEB86659FD93)
+    MASK64 = (1 << 64) - 1
+
+    def __init__(self, capacity: int):
+        width = 1
+        while width < max(capacity, 16):
+            width <<= 1
+        self.shift = 64 - (width.bit_length() - 1)
+        self.rows = [bytearray(width) for _ in self.SEEDS]
+        self.sample_size = max(capacity, 16) * 10
+        self.additions = 0
+
+    def _indexes(self, key: Hashable):
+        # Top bits of the product, so rows that share the key hash stay independent
+        h = hash(key) & self.MASK64
+        for seed in self.SEEDS:
+            yield ((h * seed) & self.MASK64) >> self.shift
+
+    def increment(self, key: Hashable) -> None:
+        for row, index in zip(self.rows, self._indexes(key)):
+            if row[index] < self.MAX_COUNT:
+                row[index] += 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self._age()
+
+    def frequency(self, key: Hashable) -> int:
+        return min(row[index] for row, index in zip(self.rows, self._indexes(key)))
+
+    def _age(self) -> None:
+        for row in self.rows:
+            for i, count in enumerate(row):
+                if count:
+                    row[i] = count >> 1
+        self.additions //= 2
+
+
+def pickled_size(value: Any) -> int:
+    """Approximate in-memory size of a cached value by its pickled length"""
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 1024
+
+
+class TinyLFUCache:
+    """
+    Bounded cache using the W-TinyLFU admission and eviction policy
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        max_bytes: Optional[int] = None,
+        window_ratio: float = 0.01,
+        protected_ratio: float = 0.8,
+        sizer: Callable[[Any], int] = pickled_size
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.window_capacity = max(1, int(max_entries * window_ratio))
+        self.main_capacity = max(1, max_entries - self.window_capacity)
+        self.protected_capacity = max(1, int(self.main_capacity * protected_ratio))
+        self.sizer = sizer
+
+        self.sketch = CountMinSketch(max_entries)
+        self._window: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._probation: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._protected: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self.bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._window) + len(self._probation) + len(self._protected)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._window or key in self._probation or key in self._protected
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Look up a key, recording the access for admission decisions"""
+        self.sketch.increment(key)
+
+        if key in self._window:
+            self._window.move_to_end(key)
+            self.hits += 1
+            return self._window[key]
+
+        if key in self._protected:
+            self._protected.move_to_end(key)
+            self.hits += 1
+            return self._protected[key]
+
+        if key in self._probation:
+            # Second hit while on probation: promote to the protected segment
+            value = self._probation.pop(key)
+            self._protected[key] = value
+            if len(self._protected) > self.protected_capacity:
+                demoted_key, demoted_value = self._protected.popitem(last=False)
+                self._probation[demoted_key] = demoted_value
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Insert or replace a key; new keys enter through the LRU window"""
+        size = self.sizer(value)
+
+        for segment in (self._window, self._probation, self._protected):
+            if key in segment:
+                segment[key] = value
+                segment.move_to_end(key)
+                self.bytes += size - self._sizes[key]
+                self._sizes[key] = size
+                self._enforce_bounds()
+                return
+
+        self.sketch.increment(key)
+        self._window[key] = value
+        self._sizes[key] = size
+        self.bytes += size
+
+        while len(self._window) > self.window_capacity:
+            candidate_key, candidate_value = self._window.popitem(last=False)
+            self._admit(candidate_key, candidate_value)
+
+        self._enforce_bounds()
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove a key without counting it as an eviction"""
+        for segment in (self._window, self._probation, self._protected):
+            if key in segment:
+                self.bytes -= self._sizes.pop(key)
+                return segment.pop(key)
+        return default
+
+    def clear(self) -> None:
+        for segment in (self._window, self._probation, self._protected):
+            segment.clear()
+        self._sizes.clear()
+        self.bytes = 0
+
+    def _admit(self, key: Hashable, value: Any) -> None:
+        """Move a window candidate into the main space if it beats the main victim"""
+        if len(self._probation) + len(self._protected) < self.main_capacity:
+            self._probation[key] = value
+            return
+
+        victims = self._probation or self._protected
+        victim_key = next(iter(victims))
+        if self.sketch.frequency(key) > self.sketch.frequency(victim_key):
+            del victims[victim_key]
+            self._drop(victim_key)
+            self._probation[key] = value
+        else:
+            self._drop(key)
+
+    def _drop(self, key: Hashable) -> None:
+        self.bytes -= self._sizes.pop(key)
+        self.evictions += 1
+
+    def _enforce_bounds(self) -> None:
+        """Evict least valuable entries until both the entry and byte limits hold"""
+        while len(self) > self.max_entries or (
+            self.max_bytes is not None and self.bytes > self.max_bytes and len(self)
+        ):
+            segment = self._probation or self._window or self._protected
+            key, _ = segment.popitem(last=False)
+            self._drop(key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit ratio, evictions and size"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "bytes": self.bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+__all__ = ["TinyLFUCache", "CountMinSketch", "pickled_size"]
@@ -0,0 +1,142 @@
+"""
+Two-Tier Cache - Local near-cache backed by a shared Redis tier
+
+Reads check the worker-local cache first, then Redis. Writes go to both, and
+each write publishes an invalidation so other workers drop their now outdated
+local copy. Without a Redis client the cache is local only.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from tinylfu_cache import TinyLFUCache
+
+logger = logging.getLogger(__name__)
+
+
+class TwoTierCache:
+    """
+    Worker-local TinyLFU cache in front of a shared Redis tier
+    """
+
+    def __init__(
+        self,
+        local: TinyLFUCache,
+        redis: Optional[Any],
+        encode: Callable[[Any], bytes],
+        decode: Callable[[bytes], Any],
+        prefix: str = "dealmate:price",
+        invalidation_channel: str = "dealmate:price:invalidate"
+    ):
+        self.local = local
+        self.redis = redis
+        self.encode = encode
+        self.decode = decode
+        self.prefix = prefix
+        self.invalidation_channel = invalidation_channel
+        self.worker_id = uuid.uuid4().hex
+
+        self._listener: Optional["asyncio.Task[None]"] = None
+        self._stats: Dict[str, int] = {
+            "remote_hits": 0,
+            "remote_misses": 0,
+            "remote_errors": 0,
+            "invalidations_sent": 0,
+            "invalidations_received": 0,
+        }
+
+    def _redis_key(self, key: str) -> str:
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+        return f"{self.prefix}:{digest}"
+
+    async def start(self) -> None:
+        """Start listening for invalidations from other workers"""
+        if self.redis is not None and self._listener is None:
+            self._listener = asyncio.create_task(self._listen_for_invalidations())
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def get(self, key: str) -> Any:
+        """Local lookup first, then the shared tier; remote hits warm the local tier"""
+        value = self.local.get(key)
+        if value is not None or self.redis is None:
+            return value
+
+        try:
+            payload = await self.redis.get(self._redis_key(key))
+        except Exception as e:
+            self._stats["remote_errors"] += 1
+            logger.warning(f"⚠️ Shared cache read failed: {e}")
+            return None
+
+        if payload is None:
+            self._stats["remote_misses"] += 1
+            return None
+
+        self._stats["remote_hits"] += 1
+        value = self.decode(payload)
+        self.local.set(key, value)
+        return value
+
+    async def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        """Store in both tiers and tell other workers to drop their local copy"""
+        self.local.set(key, value)
+        if self.redis is None:
+            return
+
+        try:
+            await self.redis.set(
+                self._redis_key(key),
+                self.encode(value),
+                px=max(1, math.ceil(ttl_seconds * 1000))
+            )
+            await self.redis.publish(self.invalidation_channel, f"{self.worker_id}|{key}")
+            self._stats["invalidations_sent"] += 1
+        except Exception as e:
+            self._stats["remote_errors"] += 1
+            logger.warning(f"⚠️ Shared cache write failed: {e}")
+
+    def pop(self, key: str) -> Any:
+        """Drop the local copy only; the shared entry expires on its own TTL"""
+        return self.local.pop(key)
+
+    async def _listen_for_invalidations(self) -> None:
+        """Drop local entries that another worker has rewritten"""
+        assert self.redis is not None
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.invalidation_channel)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    data = message["data"]
+                    if isinstance(data, bytes):
+                        data = data.decode('utf-8')
+                    sender, _, key = data.partition("|")
+                    if sender != self.worker_id:
+                        self.local.pop(key)
+                        self._stats["invalidations_received"] += 1
+            except asyncio.CancelledError:
+                await pubsub.reset()
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ Cache invalidation listener failed, resubscribing: {e}")
+                await asyncio.sleep(1.0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"local": self.local.get_stats(), **self._stats}
+
+
+__all__ = ["TwoTierCache"]
@@ -0,0 +1,107 @@
+"""
+Price Volatility Tracker - Adaptive cache TTLs from observed price changes
+
+Each product's price changes are modelled as a Poisson process. The change
+rate is estimated from decayed counts of observed changes over observed time,
+and the TTL is chosen so the chance of the price changing before expiry stays
+near a target, bounded by configured minimum and maximum TTLs. A product never
+seen changing is only trusted after `min_observed` of history, and then for at
+most `observed_multiple` times the time it has been watched.
+"""
+
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class _PriceHistory:
+    last_price: float
+    last_seen: float
+    first_seen: float
+    changes: float = 0.0  # Decayed count of observed changes
+    observed_seconds: float = 0.0  # Decayed time covered by observations
+    observations: int = 1
+
+
+class PriceVolatilityTracker:
+    """
+    Per-product change-rate estimates and the TTLs derived from them
+    """
+
+    def __init__(
+        self,
+        min_ttl: timedelta = timedelta(minutes=1),
+        max_ttl: timedelta = timedelta(hours=24),
+        change_probability: float = 0.1,
+        decay: float = 0.8,
+        max_products: int = 100_000,
+        min_observed: timedelta = timedelta(hours=1),
+        observed_multiple: float = 2.0
+    ):
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.change_probability = change_probability
+        self.decay = decay
+        self.max_products = max_products
+        self.min_observed = min_observed
+        self.observed_multiple = observed_multiple
+        self._history: "OrderedDict[str, _PriceHistory]" = OrderedDict()
+
+    def observe(self, key: str, price: float, now: Optional[float] = None) -> None:
+        """Record a fetched price for a product"""
+        now = time.time() if now is None else now
+        history = self._history.get(key)
+
+        if history is None:
+            self._history[key] = _PriceHistory(last_price=price, last_seen=now, first_seen=now)
+            if len(self._history) > self.max_products:
+                self._history.popitem(last=False)
+            return
+
+        self._history.move_to_end(key)
+        interval = max(0.0, now - history.last_seen)
+        changed = abs(price - history.last_price) > 0.005
+        history.changes = history.changes * self.decay + (1.0 if changed else 0.0)
+        history.observed_seconds = history.observed_seconds * self.decay + interval
+        history.observations += 1
+        history.last_price = price
+        history.last_seen = now
+
+    def confirm_unchanged(self, key: str, now: Optional[float] = None) -> None:
+        """Record a refresh that showed the price had not changed"""
+        history = self._history.get(key)
+        if history is not None:
+            self.observe(key, history.last_price, now)
+
+    def change_rate(self, key: str) -> Optional[float]:
+        """Estimated price changes per second, or None without enough history"""
+        history = self._history.get(key)
+        if history is None or history.observations < 2 or history.observed_seconds <= 0:
+            return None
+        return history.changes / history.observed_seconds
+
+    def ttl_for(self, key: str, default: timedelta) -> timedelta:
+        """TTL keeping the chance of a change before expiry near the target"""
+        rate = self.change_rate(key)
+        if rate is None:
+            return default
+        if rate <= 0:
+            # Two identical prices seconds apart say little about the next change
+            history = self._history[key]
+            observed = timedelta(seconds=history.last_seen - history.first_seen)
+            if observed < self.min_observed:
+                return default
+            return max(default, min(self.max_ttl, observed * self.observed_multiple))
+
+        seconds = -math.log(1 - self.change_probability) / rate
+        return max(self.min_ttl, min(self.max_ttl, timedelta(seconds=seconds)))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"tracked_products": len(self._history)}
+
+
+__all__ = ["PriceVolatilityTracker"]
@@ -0,0 +1,126 @@
+"""
+In-process stand-in for the subset of redis.asyncio the AI service uses, so
+the cross-worker features can be tested without a Redis server.
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from redis_store import RELEASE_LOCK_SCRIPT
+
+
+class InMemoryPubSub:
+    """In-process stand-in for redis.asyncio.client.PubSub"""
+
+    def __init__(self, redis: "InMemoryRedis"):
+        self._redis = redis
+        self._queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+        self._channels: List[str] = []
+
+    async def subscribe(self, *channels: str) -> None:
+        for channel in channels:
+            self._redis._subscribers.setdefault(channel, []).append(self._queue)
+            self._channels.append(channel)
+
+    async def unsubscribe(self, *channels: str) -> None:
+        for channel in channels or list(self._channels):
+            subscribers = self._redis._subscribers.get(channel, [])
+            if self._queue in subscribers:
+                subscribers.remove(self._queue)
+            if channel in self._channels:
+                self._channels.remove(channel)
+
+    async def listen(self) -> AsyncIterator[Dict[str, Any]]:
+        while True:
+            yield await self._queue.get()
+
+    async def reset(self) -> None:
+        await self.unsubscribe()
+
+
+class InMemoryRedis:
+    """
+    In-process stand-in for the subset of redis.asyncio.Redis used by the service
+    """
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[bytes, Optional[float]]] = {}
+        self._subscribers: Dict[str, List["asyncio.Queue[Dict[str, Any]]"]] = {}
+        self._lock = asyncio.Lock()
+
+    def _live(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self._data[key]
+            return None
+        return value
+
+    @staticmethod
+    def _encode(value: Any) -> bytes:
+        if isinstance(value, bytes):
+            return value
+        return str(value).encode('utf-8')
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._live(key)
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        nx: bool = False,
+        px: Optional[int] = None,
+        ex: Optional[int] = None
+    ) -> Optional[bool]:
+        async with self._lock:
+            if nx and self._live(key) is not None:
+                return None
+            ttl = px / 1000 if px else ex
+            self._data[key] = (
+                self._encode(value),
+                time.monotonic() + ttl if ttl else None,
+            )
+            return True
+
+    async def delete(self, *keys: str) -> int:
+        removed = 0
+        for key in keys:
+            if self._live(key) is not None:
+                del self._data[key]
+                removed += 1
+        return removed
+
+    async def exists(self, *keys: str) -> int:
+        return sum(1 for key in keys if self._live(key) is not None)
+
+    async def eval(self, script: str, numkeys: int, *keys_and_args: Any) -> Any:
+        """Only the scripts the service sends are supported"""
+        if script != RELEASE_LOCK_SCRIPT:
+            raise NotImplementedError("InMemoryRedis only runs RELEASE_LOCK_SCRIPT")
+        (key,), (token,) = keys_and_args[:numkeys], keys_and_args[numkeys:]
+        async with self._lock:
+            if self._live(key) != self._encode(token):
+                return 0
+            del self._data[key]
+            return 1
+
+    async def publish(self, channel: str, message: Any) -> int:
+        subscribers = self._subscribers.get(channel, [])
+        for queue in subscribers:
+            queue.put_nowait({
+                "type": "message",
+                "channel": channel.encode('utf-8'),
+                "data": self._encode(message),
+            })
+        return len(subscribers)
+
+    def pubsub(self) -> InMemoryPubSub:
+        return InMemoryPubSub(self)
+
+    async def aclose(self) -> None:
+        self._data.clear()
+        self._subscribers.clear()
@@ -0,0 +1,78 @@
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "backend" / "ai-service"))
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, FailureCache, is_platform_failure
+from http_client import HTTPStatusError
+
+
+def test_breaker_opens_probes_and_closes():
+    """
+    Tests the closed -> open -> half-open -> closed cycle, including a failed probe.
+    """
+    breaker = CircuitBreaker("amazon", failure_threshold=3, reset_timeout=0.05)
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()  # The single probe
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()  # Only one probe at a time
+    breaker.record_failure()
+    assert breaker.state == OPEN  # A failed probe reopens immediately
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+    assert breaker.get_stats()["opened"] == 2
+    assert breaker.get_stats()["rejected"] == 2
+
+
+def test_cancelled_probe_frees_its_slot():
+    """
+    Tests that a probe cancelled without a verdict lets the next probe through.
+    """
+    breaker = CircuitBreaker("flipkart", failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_cancelled()
+    assert breaker.allow()
+
+
+def test_only_retailer_failures_count_against_the_breaker():
+    """
+    Tests that 5xx and 429 trip the breaker while page-level 4xx errors do not.
+    """
+    assert is_platform_failure(HTTPStatusError(503))
+    assert is_platform_failure(HTTPStatusError(429))
+    assert not is_platform_failure(HTTPStatusError(404))
+    assert not is_platform_failure(ValueError("no price on page"))
+
+
+def test_failure_cache_expires_discards_and_stays_bounded():
+    """
+    Tests that failed keys are remembered for the TTL, can be cleared, and are capped in number.
+    """
+    cache = FailureCache(ttl=0.05, max_entries=2)
+    cache.set("amazon.in:p1", "HTTP 503")
+    assert cache.get("amazon.in:p1") == "HTTP 503"
+    time.sleep(0.06)
+    assert cache.get("amazon.in:p1") is None
+
+    cache.set("amazon.in:p2", "HTTP 503")
+    cache.discard("amazon.in:p2")
+    assert cache.get("amazon.in:p2") is None
+
+    for i in range(3, 6):
+        cache.set(f"amazon.in:p{i}", "timeout")
+    assert cache.get("amazon.in:p3") is None  # Oldest entry dropped at the cap
+    assert cache.get("amazon.in:p5") == "timeout"
+    assert cache.get_stats()["entries"] == 2
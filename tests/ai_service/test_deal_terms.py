@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "backend" / "ai-service"))
+
+from deal_terms import TermConstraints, parse_term, parse_terms
+from eligibility import attribute_bits
+
+HDFC, AMEX, VISA, ICICI, PRIME = (attribute_bits(name) for name in ("hdfc", "amex", "visa", "icici", "prime"))
+
+
+@pytest.mark.parametrize("term, expected", [
+    # Minimum spend
+    ("Min order ₹499", TermConstraints(min_order=499.0)),
+    ("Minimum purchase value of Rs. 1,500", TermConstraints(min_order=1500.0)),
+    ("On orders above INR 999", TermConstraints(min_order=999.0)),
+    # Discount caps
+    ("Max discount ₹150", TermConstraints(max_discount=150.0)),
+    ("Cashback up to Rs 200", TermConstraints(max_discount=200.0)),
+    # Card and membership restrictions
+    ("Only on HDFC cards", TermConstraints(eligibility_bits=HDFC, requires_card=True)),
+    ("Exclusive for Prime members", TermConstraints(eligibility_bits=PRIME, requires_membership=True)),
+    # Exclusions
+    ("Not valid on Amex cards", TermConstraints(excluded_bits=AMEX)),
+    ("Valid on HDFC credit cards except Amex",
+     TermConstraints(eligibility_bits=HDFC, excluded_bits=AMEX, requires_card=True)),
+    ("Valid on Visa cards; not applicable on ICICI cards",
+     TermConstraints(eligibility_bits=VISA, excluded_bits=ICICI, requires_card=True)),
+    # Combinability
+    ("Not valid with other coupons", TermConstraints(not_combinable_with=frozenset({"coupon"}))),
+    ("Not valid with bank offers", TermConstraints(not_combinable_with=frozenset({"card_offer"}))),
+    ("Cannot be combined with any other offers", TermConstraints(standalone=True)),
+    ("One coupon per order", TermConstraints(standalone=True)),
+    # No constraints
+    ("Get 10% off", TermConstraints()),
+])
+def test_parse_term(term, expected):
+    """
+    Tests the constraints parsed from common deal term phrasings.
+    """
+    assert parse_term(term) == expected
+
+
+def test_parse_terms_keeps_the_strictest_limits():
+    """
+    Tests that merged terms keep the highest minimum spend, the lowest cap and every restriction.
+    """
+    merged = parse_terms([
+        "Min order ₹499",
+        "Min order ₹999",
+        "Max discount ₹150",
+        "Up to ₹100",
+        "Only on HDFC cards",
+        "Not valid on Amex cards",
+    ])
+    assert merged == TermConstraints(
+        min_order=999.0,
+        max_discount=100.0,
+        eligibility_bits=HDFC,
+        excluded_bits=AMEX,
+        requires_card=True,
+    )
@@ -0,0 +1,49 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "backend" / "ai-service"))
+
+from stacksmart import StackSmartEngine
+
+
+def _eligible(terms, cards=None, memberships=None):
+    deal = {
+        "id": "d",
+        "title": "Bank offer",
+        "description": "",
+        "deal_type": "card_offer",
+        "value": 10,
+        "value_type": "percentage",
+        "terms": terms,
+    }
+    context = {"cards": cards or [], "memberships": memberships or []}
+    engine = StackSmartEngine()
+    return bool(engine._filter_valid_deals(engine._parse_deals([deal]), 1000.0, context))
+
+
+@pytest.mark.parametrize("terms, cards, expected", [
+    (["Valid on HDFC cards"], ["HDFC Visa"], True),
+    (["Valid on HDFC cards"], ["ICICI Visa"], False),
+    (["Valid on HDFC cards"], [], False),
+    (["Only on Visa cards"], ["HDFC Regalia"], True),  # Network not stated: unknown, not ineligible
+    (["Not valid on Amex cards"], ["Amex Platinum"], False),
+    (["Not valid on Amex cards"], ["HDFC Visa"], True),
+    (["Not valid on Amex cards"], ["HDFC Visa", "Amex Platinum"], True),
+    (["Valid on HDFC cards", "Not valid on Amex cards"], ["ICICI Visa", "Amex Platinum"], False),
+    (["Valid on HDFC cards"], ["ICICI Visa", "HDFC Millennia"], True),
+])
+def test_card_eligibility_is_checked_per_card(terms, cards, expected):
+    """
+    Tests card requirements and exclusions against each of the user's cards.
+    """
+    assert _eligible(terms, cards) is expected
+
+
+def test_membership_applies_to_every_card():
+    """
+    Tests that a membership requirement is met whichever card the user holds.
+    """
+    assert _eligible(["Exclusive for Prime members"], ["HDFC Visa"], ["Amazon Prime"])
+    assert not _eligible(["Exclusive for Prime members"], ["HDFC Visa"], [])
@@ -0,0 +1,72 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "backend" / "ai-service"))
+
+from hedging import HedgePolicy
+
+
+def _warmed(platform="amazon", seconds=0.01, **options):
+    policy = HedgePolicy(**options)
+    for _ in range(policy.min_samples):
+        policy.record(platform, seconds)
+    return policy
+
+
+def test_delay_follows_the_percentile_with_a_floor():
+    """
+    Tests that no hedge delay exists before min_samples and that it tracks p95 above min_delay.
+    """
+    policy = HedgePolicy(min_samples=20, min_delay=0.05)
+    for _ in range(19):
+        policy.record("amazon", 0.01)
+    assert policy.delay("amazon") is None
+
+    policy.record("amazon", 0.01)
+    assert policy.delay("amazon") == 0.05  # p95 of 10 ms is below the floor
+
+    for latency in range(1, 101):
+        policy.record("flipkart", latency / 100)
+    assert policy.delay("flipkart") == 0.96
+
+
+def test_slow_fetch_is_hedged_and_the_hedge_wins():
+    """
+    Tests that a fetch slower than the delay gets one duplicate whose result is returned first.
+    """
+    policy = _warmed(min_delay=0.02)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(1.0 if len(calls) == 1 else 0.01)
+        return len(calls)
+
+    started = time.monotonic()
+    result = asyncio.run(policy.run("amazon", fetch))
+
+    assert result == 2
+    assert time.monotonic() - started < 0.5
+    assert policy.get_stats()["hedged"] == 1
+    assert policy.get_stats()["hedge_wins"] == 1
+
+
+def test_hedges_are_capped_by_the_budget():
+    """
+    Tests that when every fetch is slow, hedges stop at the budget's burst plus its ratio of fetches.
+    """
+    policy = _warmed(min_delay=0.02, max_hedge_ratio=0.05)
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return 499.0
+
+    async def scenario():
+        return await asyncio.gather(*(policy.run("amazon", fetch) for _ in range(40)))
+
+    assert asyncio.run(scenario()) == [499.0] * 40
+    stats = policy.get_stats()
+    assert stats["hedged"] == policy.budget.burst  # All fetches deposit before any hedge spends
+    assert stats["budget"]["denied"] == 40 - stats["hedged"]
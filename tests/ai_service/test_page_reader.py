@@ -0,0 +1,80 @@
+import asyncio
+import gzip
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "backend" / "ai-service"))
+
+from page_reader import DecompressionBombError, read_page
+
+
+class _Response:
+    """Undecompressed response body served in fixed-size chunks, counting how many were pulled"""
+
+    def __init__(self, body, headers):
+        self.body = body
+        self.headers = headers
+        self.chunks_read = 0
+
+    async def iter_chunks(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            self.chunks_read += 1
+            yield self.body[start:start + chunk_size]
+
+
+class _Collector:
+    """Consumer that keeps everything it is fed and never asks to stop"""
+
+    def __init__(self):
+        self.text = []
+
+    def feed(self, text, final=False):
+        self.text.append(text)
+        return False
+
+
+def test_oversized_body_is_truncated_at_the_cap():
+    """
+    Tests that reading stops at max_bytes without pulling the rest of the body.
+    """
+    response = _Response(b"<div>" + b"x" * 1_000_000, {"Content-Type": "text/html; charset=utf-8"})
+    consumer = _Collector()
+
+    result = asyncio.run(read_page(response, consumer, max_bytes=50_000, chunk_size=16 * 1024))
+
+    assert result.truncated
+    assert result.decoded_bytes == 50_000
+    assert len("".join(consumer.text)) == 50_000
+    assert response.chunks_read == 4  # ceil(50_000 / 16_384), not the full 62 chunks
+
+
+def test_compressed_body_is_inflated_only_up_to_the_cap():
+    """
+    Tests that a gzip body larger than the cap is truncated without inflating the remainder.
+    """
+    html = "".join(f"<li data-sku='{i}'>₹{i * 7 % 9973}</li>" for i in range(100_000)).encode()
+    response = _Response(gzip.compress(html), {"Content-Encoding": "gzip"})
+    consumer = _Collector()
+
+    result = asyncio.run(read_page(response, consumer, max_bytes=64 * 1024, chunk_size=8 * 1024))
+
+    assert result.truncated
+    assert result.decoded_bytes == 64 * 1024
+    assert "".join(consumer.text).startswith(html[:60_000].decode(errors="ignore"))
+    assert result.wire_bytes < len(response.body)
+
+
+def test_gzip_bomb_aborts_the_read():
+    """
+    Tests that a body expanding past max_compression_ratio raises before it is read to the end.
+    """
+    response = _Response(gzip.compress(b"\0" * 20_000_000), {"Content-Encoding": "gzip"})
+    consumer = _Collector()
+
+    with pytest.raises(DecompressionBombError):
+        asyncio.run(read_page(response, consumer, max_bytes=100_000_000, chunk_size=4096))
+
+    assert response.chunks_read == 1
+    assert consumer.text == []
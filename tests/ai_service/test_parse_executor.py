@@ -0,0 +1,79 @@
+import asyncio
+import gzip
+import sys
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "backend" / "ai-service"))
+
+from page_reader import read_page
+from parse_executor import ParseExecutor
+from selector_extraction import PageExtractor
+
+
+class _Response:
+    def __init__(self, body, headers):
+        self.body = body
+        self.headers = headers
+
+    async def iter_chunks(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start:start + chunk_size]
+
+
+def test_process_lane_keeps_state_in_its_worker():
+    """
+    Tests that an object created on a process lane keeps its state across calls until released.
+    """
+    async def scenario():
+        executor = ParseExecutor(workers=1, processes=True)
+        try:
+            await executor.start()
+            lane = executor.lane()
+            counter = await lane.create(Counter)
+            await lane.call(counter, "update", "amazon")
+            await lane.call(counter, "update", "flipkart")
+            most_common = await lane.call(counter, "most_common", 1)
+            lane.release(counter)
+            return most_common, executor.get_stats()
+        finally:
+            executor.close()
+
+    most_common, stats = asyncio.run(scenario())
+    assert most_common == [("a", 3)]
+    assert stats["processes"] and stats["jobs"] == 4
+
+
+def test_page_is_extracted_on_a_process_lane():
+    """
+    Tests that a gzip page streamed through a process lane yields the same result as inline parsing.
+    """
+    html = (
+        "<html><head><title>Phone</title></head><body>"
+        + "<p>filler</p>" * 5000
+        + "<span class='price'>₹1,299.50</span> In stock</body></html>"
+    )
+    headers = {"Content-Encoding": "gzip", "Content-Type": "text/html; charset=utf-8"}
+    selectors = {"price": ".price"}
+
+    async def scenario():
+        inline = PageExtractor("amazon.in", selectors)
+        await read_page(_Response(gzip.compress(html.encode()), headers), inline, chunk_size=4096)
+
+        executor = ParseExecutor(workers=1, processes=True)
+        try:
+            lane = executor.lane()
+            extractor = await lane.create(PageExtractor, "amazon.in", selectors)
+            read = await read_page(
+                _Response(gzip.compress(html.encode()), headers), extractor, chunk_size=4096, lane=lane
+            )
+            result = await lane.call(extractor, "result")
+            lane.release(extractor)
+            return inline.result(), read, result
+        finally:
+            executor.close()
+
+    expected, read, result = asyncio.run(scenario())
+    assert result == expected
+    assert result["base_price"] == 1299.5
+    assert read.decoded_bytes == len(html.encode())
@@ -0,0 +1,61 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "backend" / "ai-service"))
+
+from http_client import HTTPStatusError
+from retry import RetryPolicy
+
+
+def test_retry_budget_caps_retries_during_an_outage():
+    """
+    Tests that retries stop at the budget's ratio of fetches plus its burst when every fetch fails.
+    """
+    policy = RetryPolicy(max_attempts=3, base_delay=0.0, budget_ratio=0.1, budget_burst=2.0)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        raise HTTPStatusError(503)
+
+    async def outage():
+        for _ in range(50):
+            with pytest.raises(HTTPStatusError):
+                await policy.run("amazon", fetch)
+
+    asyncio.run(outage())
+    stats = policy.get_stats()["platforms"]["amazon"]
+    assert stats["retries"] <= 2 + 0.1 * 50
+    assert len(calls) == 50 + stats["retries"]
+    assert stats["budget_exhausted"] > 0
+
+
+def test_transient_error_is_retried_and_page_error_is_not():
+    """
+    Tests that a 503 is retried to success while a 404 fails on the first attempt.
+    """
+    policy = RetryPolicy(max_attempts=3, base_delay=0.0)
+    attempts = {"flaky": 0, "missing": 0}
+
+    async def flaky():
+        attempts["flaky"] += 1
+        if attempts["flaky"] == 1:
+            raise HTTPStatusError(503)
+        return 499.0
+
+    async def missing():
+        attempts["missing"] += 1
+        raise HTTPStatusError(404)
+
+    async def scenario():
+        price = await policy.run("flipkart", flaky)
+        with pytest.raises(HTTPStatusError):
+            await policy.run("flipkart", missing)
+        return price
+
+    assert asyncio.run(scenario()) == 499.0
+    assert attempts == {"flaky": 2, "missing": 1}
+    assert policy.get_stats()["platforms"]["flipkart"]["retry_successes"] == 1
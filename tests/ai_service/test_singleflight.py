@@ -0,0 +1,102 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "backend" / "ai-service"))
+
+from fake_redis import InMemoryRedis
+from redis_store import RELEASE_LOCK_SCRIPT
+from singleflight import RedisSingleFlight
+
+
+def _worker(redis, **options):
+    return RedisSingleFlight(redis, json.dumps, json.loads, poll_interval=0.01, **options)
+
+
+def test_workers_coalesce_through_shared_redis():
+    """
+    Tests that concurrent fetches of one key on several workers run the fetch once.
+    """
+    async def scenario():
+        redis = InMemoryRedis()
+        workers = [_worker(redis) for _ in range(3)]
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {"price": 499.0}
+
+        results = await asyncio.gather(*(worker.do("amazon.in:p1", fetch) for worker in workers))
+        return results, calls, workers, redis
+
+    results, calls, workers, redis = asyncio.run(scenario())
+    assert results == [{"price": 499.0}] * 3
+    assert len(calls) == 1
+    assert sum(worker.get_stats()["leader"] for worker in workers) == 1
+    assert sum(worker.get_stats()["follower_hits"] for worker in workers) == 2
+
+
+
+def test_one_follower_takes_over_when_the_leader_fails():
+    """
+    Tests that a failed leader is replaced by one follower, not by every follower.
+    """
+    async def scenario():
+        redis = InMemoryRedis()
+        workers = [_worker(redis) for _ in range(4)]
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.03)
+            if len(calls) == 1:
+                raise RuntimeError("retailer timed out")
+            return {"price": 499.0}
+
+        results = await asyncio.gather(
+            *(worker.do("amazon.in:p1", fetch) for worker in workers), return_exceptions=True
+        )
+        return results, calls, workers
+
+    results, calls, workers = asyncio.run(scenario())
+    assert len(calls) == 2
+    assert sum(isinstance(result, RuntimeError) for result in results) == 1
+    assert [result for result in results if not isinstance(result, Exception)] == [{"price": 499.0}] * 3
+    assert sum(worker.get_stats()["takeovers"] for worker in workers) == 1
+    assert sum(worker.get_stats()["follower_fallbacks"] for worker in workers) == 0
+
+def test_release_keeps_lock_taken_over_by_another_worker():
+    """
+    Tests that a leader whose lock expired does not delete the new holder's lock.
+    """
+    async def scenario():
+        redis = InMemoryRedis()
+        worker = _worker(redis, lock_ttl=0.02)
+        lock_key = f"{worker.prefix}:lock:amazon.in:p1"
+
+        async def fetch():
+            await asyncio.sleep(0.05)  # Outlives the lock
+            await redis.set(lock_key, "other-worker", nx=True, px=1000)
+            return 1
+
+        await worker.do("amazon.in:p1", fetch)
+        return await redis.get(lock_key)
+
+    assert asyncio.run(scenario()) == b"other-worker"
+
+
+def test_release_script_deletes_only_matching_token():
+    """
+    Tests the compare-and-delete lock release script.
+    """
+    async def scenario():
+        redis = InMemoryRedis()
+        await redis.set("lock", "token-a")
+        mismatched = await redis.eval(RELEASE_LOCK_SCRIPT, 1, "lock", "token-b")
+        held = await redis.get("lock")
+        matched = await redis.eval(RELEASE_LOCK_SCRIPT, 1, "lock", "token-a")
+        return mismatched, held, matched, await redis.get("lock")
+
+    assert asyncio.run(scenario()) == (0, b"token-a", 1, None)
@@ -0,0 +1,113 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "backend" / "ai-service"))
+
+from stacksmart import StackSmartEngine
+
+
+def _deal(deal_id, value, platform="x", deal_type="coupon", value_type="fixed", **extra):
+    return {
+        "id": deal_id,
+        "title": deal_id,
+        "description": "",
+        "deal_type": deal_type,
+        "value": value,
+        "value_type": value_type,
+        "platform": platform,
+        **extra,
+    }
+
+
+def _ids(deals):
+    return sorted(deal.id for deal in deals)
+
+
+def test_frontier_keeps_the_stack_preferences_pick():
+    """
+    Tests that a smaller saving on a preferred platform survives on the frontier.
+    """
+    engine = StackSmartEngine()
+    deals = [_deal("a", 10, platform="x"), _deal("b", 9, platform="amazon")]
+    preferences = {"preferred_platforms": ["amazon"]}
+
+    async def scenario():
+        optimized = await engine.optimize_deals(deals, 100.0, preferences)
+        frontier = await engine.optimize_deals_frontier(deals, 100.0, preferences)
+        return optimized, frontier
+
+    optimized, frontier = asyncio.run(scenario())
+    assert [_ids(point.deals) for point in frontier] == [["a"], ["b"]]
+    assert _ids(engine.select_from_frontier(frontier, 100.0, preferences).deals) == ["b"]
+    assert _ids(optimized.deals) == ["b"]
+    assert _ids(engine.select_from_frontier(frontier, 100.0, {}).deals) == ["a"]
+
+
+def test_frontier_drops_dominated_stacks():
+    """
+    Tests that the frontier holds only points trading savings against preference score.
+    """
+    engine = StackSmartEngine()
+    deals = [
+        _deal("c1", 50, platform="amazon"),
+        _deal("c2", 40, platform="amazon"),
+        _deal("cb", 20, platform="x", deal_type="cashback"),
+        _deal("w", 5, platform="flipkart", deal_type="wallet_offer"),
+    ]
+    preferences = {"preferred_platforms": ["flipkart"]}
+
+    frontier = asyncio.run(engine.optimize_deals_frontier(deals, 500.0, preferences))
+    expected = [point.total_savings * point.confidence for point in frontier]
+    assert expected == sorted(expected, reverse=True)
+    scores = [point.preference_score for point in frontier]
+    assert scores == sorted(set(scores))
+    assert all(point.stack_size <= 3 for point in frontier)
+
+
+def _mixed_deals(count):
+    deal_types = ["coupon", "cashback", "wallet_offer", "card_offer"]
+    return [
+        _deal(f"d{i}", 5 + (i * 7) % 23, deal_type=deal_types[i % 4], value_type="percentage")
+        for i in range(count)
+    ]
+
+
+def test_deadline_cuts_the_search_short():
+    """
+    Tests that a deadline too short for any search still returns a non-empty approximate stack.
+    """
+    engine = StackSmartEngine()
+
+    result = asyncio.run(engine.optimize_deals(_mixed_deals(200), 1000.0, deadline=0.0))
+
+    assert result.mode == "approximate"
+    assert len(result.deals) == 1  # Construction stops once the first deal is in hand
+    assert result.optimality_gap > 0
+    assert result.processing_time < 1.0
+
+
+def test_reported_gap_bounds_the_distance_to_the_optimum():
+    """
+    Tests that the approximate score plus its reported gap is at least the exact optimum.
+    """
+    deals = _mixed_deals(16)
+    preferences = {"preferred_platforms": ["x"]}
+    exact_engine = StackSmartEngine()
+    approximate_engine = StackSmartEngine()
+    approximate_engine.optimization_rules["max_exact_combinations"] = 0
+
+    async def scenario():
+        exact = await exact_engine.optimize_deals(deals, 1000.0, preferences)
+        approximate = await approximate_engine.optimize_deals(deals, 1000.0, preferences)
+        return exact, approximate
+
+    exact, approximate = asyncio.run(scenario())
+    assert (exact.mode, exact.optimality_gap) == ("exact", 0.0)
+    assert approximate.mode == "approximate"
+
+    def score(result):
+        return exact_engine._score_combination(result.deals, 1000.0, preferences)
+
+    assert score(approximate) <= score(exact)
+    assert score(exact) - score(approximate) <= approximate.optimality_gap + 1e-9
@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "backend" / "ai-service"))
+
+from tinylfu_cache import TinyLFUCache
+
+
+def test_one_off_scan_does_not_evict_hot_entries():
+    """
+    Tests that a burst of never-repeated keys is refused admission over frequently read keys.
+    """
+    cache = TinyLFUCache(max_entries=1000)
+    hot = [f"amazon.in:hot{i}" for i in range(20)]
+    for key in hot:
+        cache.set(key, key)
+    for _ in range(10):
+        for key in hot:
+            assert cache.get(key) == key
+
+    for i in range(3000):
+        cache.set(f"flipkart.com:scan{i}", i)
+
+    assert all(key in cache for key in hot)
+    assert len(cache) == 1000
+    assert cache.get_stats()["evictions"] == 2020
+
+
+def test_frequent_newcomer_replaces_cold_entry():
+    """
+    Tests that a window candidate read more often than the main victim is admitted.
+    """
+    cache = TinyLFUCache(max_entries=10, window_ratio=0.1)
+    for i in range(10):
+        cache.set(f"cold{i}", i)
+
+    for _ in range(4):
+        cache.get("popular")  # Misses still count towards admission frequency
+    cache.set("popular", "value")
+    cache.set("cold-next", 0)  # Pushes "popular" out of the window
+
+    assert "popular" in cache
+    assert len(cache) == 10
+
+
+def test_entry_and_byte_bounds_hold():
+    """
+    Tests that both the entry limit and the byte limit are enforced on insert and replace.
+    """
+    cache = TinyLFUCache(max_entries=20, max_bytes=100, sizer=len)
+    for i in range(50):
+        cache.set(f"k{i}", "x" * 10)
+        assert len(cache) <= 20
+        assert cache.bytes <= 100
+
+    survivor = next(key for key in (f"k{i}" for i in range(50)) if key in cache)
+    cache.set(survivor, "x" * 60)  # Growing an entry in place also respects the byte limit
+    assert cache.bytes <= 100
+
+    remaining = next(key for key in (f"k{i}" for i in range(50)) if key in cache)
+    evictions, before = cache.evictions, cache.bytes
+    removed = cache.pop(remaining)
+    assert cache.bytes == before - len(removed)
+    assert cache.evictions == evictions  # Explicit removal is not an eviction
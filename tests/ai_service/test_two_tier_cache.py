@@ -0,0 +1,53 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "backend" / "ai-service"))
+
+from fake_redis import InMemoryRedis
+from tinylfu_cache import TinyLFUCache
+from two_tier_cache import TwoTierCache
+
+
+def _worker(redis):
+    return TwoTierCache(TinyLFUCache(max_entries=100), redis, lambda v: json.dumps(v).encode(), json.loads)
+
+
+async def _until(condition, timeout=1.0):
+    loop = asyncio.get_running_loop()
+    give_up_at = loop.time() + timeout
+    while not condition() and loop.time() < give_up_at:
+        await asyncio.sleep(0.005)
+
+
+def test_write_on_one_worker_evicts_the_others_local_entry():
+    """
+    Tests that a write on one worker drops the stale local copy on another worker.
+    """
+    async def scenario():
+        redis = InMemoryRedis()
+        first, second = _worker(redis), _worker(redis)
+        await first.start()
+        await second.start()
+        await asyncio.sleep(0)  # Let both listeners subscribe
+
+        await first.set("amazon.in:p1", {"price": 499.0}, ttl_seconds=60)
+        warmed = await second.get("amazon.in:p1")  # Remote hit, now cached locally
+        await first.set("amazon.in:p1", {"price": 449.0}, ttl_seconds=60)
+        await _until(lambda: "amazon.in:p1" not in second.local)
+
+        evicted = "amazon.in:p1" not in second.local
+        kept_by_writer = first.local.get("amazon.in:p1")
+        refreshed = await second.get("amazon.in:p1")
+        stats = second.get_stats()
+        await first.close()
+        await second.close()
+        return warmed, evicted, kept_by_writer, refreshed, stats
+
+    warmed, evicted, kept_by_writer, refreshed, stats = asyncio.run(scenario())
+    assert warmed == {"price": 499.0}
+    assert evicted
+    assert kept_by_writer == {"price": 449.0}
+    assert refreshed == {"price": 449.0}
+    assert stats["invalidations_received"] == 2
@@ -0,0 +1,45 @@
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "backend" / "ai-service"))
+
+from volatility import PriceVolatilityTracker
+
+DEFAULT = timedelta(minutes=5)
+
+
+def test_unchanged_price_needs_history_before_a_long_ttl():
+    """
+    Tests that two equal prices seconds apart keep the default TTL.
+    """
+    tracker = PriceVolatilityTracker()
+    tracker.observe("p", 100.0, now=0)
+    tracker.observe("p", 100.0, now=5)
+    assert tracker.ttl_for("p", DEFAULT) == DEFAULT
+
+
+def test_unchanged_price_ttl_grows_with_observed_time():
+    """
+    Tests that a stable price earns a TTL bounded by a multiple of the time watched.
+    """
+    tracker = PriceVolatilityTracker(observed_multiple=2.0)
+    now = 0
+    for _ in range(13):
+        tracker.observe("p", 100.0, now=now)
+        now += 300
+    assert tracker.ttl_for("p", DEFAULT) == timedelta(hours=2)
+
+    tracker.observe("q", 100.0, now=0)
+    tracker.observe("q", 100.0, now=30 * 3600)
+    assert tracker.ttl_for("q", DEFAULT) == tracker.max_ttl
+
+
+def test_changing_price_gets_short_ttl():
+    """
+    Tests that an observed change shortens the TTL.
+    """
+    tracker = PriceVolatilityTracker()
+    tracker.observe("p", 100.0, now=0)
+    tracker.observe("p", 110.0, now=60)
+    assert tracker.ttl_for("p", DEFAULT) == tracker.min_ttl